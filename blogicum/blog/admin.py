@@ -1,9 +1,10 @@
 from django.contrib import admin
 
-from .models import Location, Category, Post, Comment
+from .models import Location, Category, Post, Comment, OutboxMessage
 
 
 admin.site.register(Location)
 admin.site.register(Category)
 admin.site.register(Post)
 admin.site.register(Comment)
+admin.site.register(OutboxMessage)
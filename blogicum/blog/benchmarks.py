@@ -0,0 +1,314 @@
+import io
+import random
+import threading
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.db import OperationalError, connection, transaction
+from django.db.models import Count
+from django.template.loader import render_to_string
+from django.test import Client
+from django.utils import timezone
+
+from .cache import get_page_cache
+from .middleware import QueryCounter
+from .models import Comment, Post
+from .paginators import encode_cursor
+
+# Отношение объёмов к числу публикаций в наборе данных.
+COMMENTS_PER_POST = 10
+USERS_PER_SCALE = 200
+PERCENTILES = (50, 90, 99)
+# Профиль SQLite по умолчанию: журнал отката и полная синхронизация.
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'delete',
+    'synchronous': 'full',
+}
+
+
+def percentile(sorted_values, percent):
+    """Процентиль по ближайшему рангу"""
+    index = max(round(percent / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def grow_dataset(posts, seed, first):
+    """Догенерация данных до заданного числа публикаций"""
+    missing = posts - Post.objects.count()
+    if missing <= 0:
+        return
+    call_command(
+        'generate_dataset',
+        users=USERS_PER_SCALE if first else 0,
+        categories=20 if first else 0,
+        locations=50 if first else 0,
+        posts=missing,
+        comments=missing * COMMENTS_PER_POST,
+        image_ratio=0,
+        seed=seed + posts,
+        stdout=io.StringIO(),
+    )
+
+
+def build_targets():
+    """Запросы к представлениям на самых тяжёлых объектах набора"""
+    published = Post.published.order_by('-pub_date', '-pk')
+    busiest_post = Post.published.order_by('-comment_count').first()
+    top_category = published.values('category__slug').annotate(
+        total=Count('pk'),
+    ).order_by('-total').first()['category__slug']
+    top_author = published.values('author__username').annotate(
+        total=Count('pk'),
+    ).order_by('-total').first()['author__username']
+    middle = published[published.count() // 2]
+    counter = iter(range(10 ** 9))
+
+    def add_comment(client):
+        return client.post(
+            f'/posts/{busiest_post.pk}/comment/',
+            {'text': f'Комментарий {next(counter)}'},
+        )
+
+    def create_post(client):
+        return client.post('/posts/create/', {
+            'title': f'Пост {next(counter)}',
+            'text': 'Текст',
+            'category': busiest_post.category_id,
+            'is_published': True,
+            'pub_date': (timezone.now() - timedelta(days=1)).date(),
+        })
+
+    return {
+        'index': lambda client: client.get('/'),
+        'index_deep_keyset': lambda client: client.get(
+            f'/?after={encode_cursor(middle)}'
+        ),
+        'category_posts': lambda client: client.get(
+            f'/category/{top_category}/'
+        ),
+        'post_detail': lambda client: client.get(
+            f'/posts/{busiest_post.pk}/'
+        ),
+        'profile': lambda client: client.get(f'/profile/{top_author}/'),
+        'add_comment': add_comment,
+        'create_post': create_post,
+    }
+
+
+def measure(client, request, repeats, warmup):
+    """Задержки, число запросов и пик выделенной памяти для представления"""
+    for _ in range(warmup):
+        request(client)
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        response = request(client)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response.status_code not in (200, 302):
+            raise AssertionError(
+                f'{response.request["PATH_INFO"]} вернул '
+                f'{response.status_code}'
+            )
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        request(client)
+    tracemalloc.start()
+    try:
+        request(client)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    latencies.sort()
+    result = {
+        f'p{percent}_ms': round(percentile(latencies, percent), 3)
+        for percent in PERCENTILES
+    }
+    result['mean_ms'] = round(sum(latencies) / len(latencies), 3)
+    result['queries'] = counter.queries
+    result['peak_kib'] = round(peak / 1024, 1)
+    return result
+
+
+def run_benchmarks(scales, user, repeats=30, warmup=3, seed=0, log=None):
+    """Прогон всех представлений на наборах возрастающего размера
+
+    Возвращает {представление: {число постов: метрики}}. Запросы
+    выполняет авторизованный пользователь, чтобы мерить работу
+    представлений, а не попадания в кэш страниц для анонимов.
+    """
+    client = Client()
+    client.force_login(user)
+    results = {}
+    for number, posts in enumerate(sorted(scales)):
+        grow_dataset(posts, seed, first=number == 0)
+        get_page_cache().clear()
+        for name, request in build_targets().items():
+            metrics = measure(client, request, repeats, warmup)
+            results.setdefault(name, {})[str(posts)] = metrics
+            if log is not None:
+                log(f'{posts:>9} {name:<20} {metrics}')
+    return results
+
+
+def compare(results, baseline, tolerance=1.5):
+    """Регрессии относительно прошлого прогона: медиана и число запросов"""
+    regressions = []
+    for name, scales in results.items():
+        for posts, metrics in scales.items():
+            previous = baseline.get(name, {}).get(posts)
+            if previous is None:
+                continue
+            if metrics['p50_ms'] > previous['p50_ms'] * tolerance:
+                regressions.append(
+                    f'{name} на {posts} постах: медиана {metrics["p50_ms"]} '
+                    f'мс против {previous["p50_ms"]} мс'
+                )
+            if metrics['queries'] > previous['queries']:
+                regressions.append(
+                    f'{name} на {posts} постах: {metrics["queries"]} '
+                    f'SQL-запросов против {previous["queries"]}'
+                )
+    return regressions
+
+
+def check_scaling(results, max_growth):
+    """Представления, чья медиана растёт вместе с объёмом данных
+
+    Ленты и страницы постов должны работать за время, не зависящее от
+    размера таблиц, поэтому рост медианы между самым маленьким и самым
+    большим набором больше чем в max_growth раз считается ошибкой.
+    """
+    regressions = []
+    for name, scales in results.items():
+        if len(scales) < 2:
+            continue
+        ordered = sorted(scales.items(), key=lambda item: int(item[0]))
+        (small, first), (large, last) = ordered[0], ordered[-1]
+        growth = last['p50_ms'] / max(first['p50_ms'], 0.001)
+        if growth > max_growth:
+            regressions.append(
+                f'{name}: медиана выросла в {growth:.1f} раза '
+                f'с {small} до {large} постов'
+            )
+    return regressions
+
+
+def _worker(operation, deadline, persistent, stats, lock):
+    done = errors = 0
+    try:
+        while time.perf_counter() < deadline:
+            try:
+                operation()
+                done += 1
+            except OperationalError:
+                errors += 1
+            if not persistent:
+                connection.close()
+    finally:
+        connection.close()
+        with lock:
+            stats['ops'] += done
+            stats['errors'] += errors
+
+
+def mixed_workload(readers=4, writers=2, duration=5.0, persistent=True):
+    """Пропускная способность смешанной нагрузки чтения и записи
+
+    Читатели открывают ленту, писатели добавляют комментарии так же,
+    как add_comment. Без persistent каждый запрос идёт через новое
+    соединение, как при CONN_MAX_AGE = 0.
+    """
+    post_ids = list(
+        Post.published.values_list('pk', flat=True)[:100]
+    )
+    author_id = Post.objects.values_list('author_id', flat=True).first()
+
+    def read():
+        list(Post.published.select_related(
+            'author', 'category', 'location',
+        ).order_by('-pub_date', '-pk')[:10])
+
+    def write():
+        with transaction.atomic():
+            Comment.objects.create(
+                post_id=random.choice(post_ids),
+                author_id=author_id,
+                text='Нагрузочный комментарий',
+            )
+
+    lock = threading.Lock()
+    stats = {
+        'read': {'ops': 0, 'errors': 0},
+        'write': {'ops': 0, 'errors': 0},
+    }
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(
+            target=_worker,
+            args=(operation, deadline, persistent, stats[kind], lock),
+        )
+        for kind, operation, count in (
+            ('read', read, readers),
+            ('write', write, writers),
+        )
+        for _ in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        kind: {
+            'ops_per_second': round(values['ops'] / duration, 1),
+            'errors': values['errors'],
+        }
+        for kind, values in stats.items()
+    }
+
+
+def feed_materialization(per_page=100, repeats=30):
+    """Экземпляры Post против строк PostRow для страницы ленты
+
+    Для каждого варианта замеряется построение страницы и построение
+    вместе с рендером карточек без кэша фрагментов, а также пик памяти
+    при построении.
+    """
+    variants = {
+        'models': lambda: Post.published.select_related(
+            'author', 'category', 'location',
+        ).defer('text').order_by('-pub_date', '-pk')[:per_page],
+        'rows': lambda: Post.published.rows().order_by(
+            '-pub_date', '-pk',
+        )[:per_page],
+    }
+
+    def build(queryset):
+        return list(queryset())
+
+    def render(queryset):
+        for post in queryset():
+            render_to_string('includes/post_card.html', {'post': post})
+
+    results = {}
+    for name, queryset in variants.items():
+        metrics = {}
+        for stage, run in (('build', build), ('render', render)):
+            run(queryset)
+            latencies = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                run(queryset)
+                latencies.append((time.perf_counter() - start) * 1000)
+            latencies.sort()
+            metrics[f'{stage}_p50_ms'] = round(percentile(latencies, 50), 3)
+        tracemalloc.start()
+        try:
+            build(queryset)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        metrics['build_peak_kib'] = round(peak / 1024, 1)
+        results[name] = metrics
+    return results
@@ -0,0 +1,211 @@
+import gzip
+import io
+import json
+import zlib
+from itertools import chain, islice
+
+from django.apps import apps
+from django.core.serializers import python
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connections
+
+READ_SIZE = 64 * 1024
+WHITESPACE = ' \t\r\n'
+EXPORT_CHUNK_SIZE = 2000
+# Порядок выгрузки: сначала справочники, затем ссылающиеся на них модели.
+EXPORT_MODELS = (
+    'blog.category',
+    'blog.location',
+    'blog.post',
+    'blog.comment',
+)
+
+
+def open_text(path, mode='rt'):
+    """Открытие файла дампа; .gz распаковывается и сжимается на лету"""
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def iter_dump_records(stream, read_size=READ_SIZE):
+    """Записи дампа из JSON-массива (dumpdata) или из JSON Lines"""
+    head = stream.read(read_size)
+    if head.lstrip(WHITESPACE).startswith('['):
+        return iter_json_array(stream, read_size, head)
+    # Дочитываем строку, оборванную на границе первого куска.
+    lines = chain(io.StringIO(head + stream.readline()), stream)
+    return (json.loads(line) for line in lines if line.strip())
+
+
+class _StreamBuffer:
+    """Неразобранный хвост потока, дочитываемый кусками по требованию"""
+
+    def __init__(self, stream, read_size, head=''):
+        self.stream = stream
+        self.read_size = read_size
+        self.buffer = head
+        self.position = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self):
+        if self.eof:
+            raise ValueError('Неожиданный конец JSON-массива')
+        chunk = self.stream.read(self.read_size)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+
+    def peek(self):
+        """Следующий значащий символ без сдвига позиции"""
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in WHITESPACE
+            ):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            self.fill()
+
+    def next_char(self):
+        char = self.peek()
+        self.position += 1
+        return char
+
+    def decode(self):
+        """Очередное JSON-значение; оборванное на границе куска дочитывается"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self.fill()
+                continue
+            if end == len(self.buffer) and not self.eof:
+                # Число на границе куска могло оборваться.
+                self.fill()
+                continue
+            self.position = end
+            return value
+
+
+def iter_json_array(stream, read_size=READ_SIZE, head=''):
+    """Элементы JSON-массива из потока по одному
+
+    Файл читается кусками по read_size символов, в памяти держится
+    только текущий неразобранный хвост, а не весь массив. head — уже
+    прочитанное из потока начало.
+    """
+    buffer = _StreamBuffer(stream, read_size, head)
+    if buffer.next_char() != '[':
+        raise ValueError('Дамп должен быть JSON-массивом')
+    if buffer.peek() == ']':
+        return
+    while True:
+        yield buffer.decode()
+        char = buffer.next_char()
+        if char == ']':
+            return
+        if char != ',':
+            raise ValueError(f'Ожидалась запятая, получено {char!r}')
+
+
+def parse_checkpoint(value):
+    """Разбор контрольной точки вида 'blog.post:1234'"""
+    label, _, pk = value.rpartition(':')
+    if label.lower() not in EXPORT_MODELS:
+        raise ValueError(f'Неизвестная модель в контрольной точке: {label}')
+    return label.lower(), int(pk)
+
+
+def iter_export(labels=EXPORT_MODELS, checkpoint=None,
+                chunk_size=EXPORT_CHUNK_SIZE):
+    """Выгрузка моделей в JSON Lines с постоянным расходом памяти
+
+    Объекты читаются через iterator() по возрастанию pk и сериализуются
+    пачками по chunk_size. Отдаются кортежи (модель, pk, строка), чтобы
+    вызывающий код мог запоминать контрольную точку. С checkpoint
+    выгрузка продолжается с объекта, следующего за ней.
+    """
+    labels = [label for label in EXPORT_MODELS if label in labels]
+    after_pk = 0
+    if checkpoint is not None:
+        checkpoint_label, after_pk = checkpoint
+        labels = labels[labels.index(checkpoint_label):]
+    serializer = python.Serializer()
+    for label in labels:
+        objects = apps.get_model(label)._default_manager.filter(
+            pk__gt=after_pk,
+        ).order_by('pk').iterator(chunk_size=chunk_size)
+        after_pk = 0
+        while True:
+            batch = list(islice(objects, chunk_size))
+            if not batch:
+                break
+            for record in serializer.serialize(batch):
+                line = json.dumps(
+                    record, cls=DjangoJSONEncoder, ensure_ascii=False
+                )
+                yield label, record['pk'], line + '\n'
+
+
+def iter_blocks(lines, block_size=READ_SIZE, compress=False):
+    """Склейка строк в блоки для отдачи по сети, при необходимости gzip"""
+    compressor = None
+    if compress:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    block = []
+    size = 0
+    for line in lines:
+        data = line.encode()
+        block.append(data)
+        size += len(data)
+        if size >= block_size:
+            data = b''.join(block)
+            block, size = [], 0
+            if compressor is not None:
+                data = compressor.compress(data)
+            if data:
+                yield data
+    data = b''.join(block)
+    if compressor is not None:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
+
+
+def insert_rows(model, field_names, rows, using=DEFAULT_DB_ALIAS,
+                ignore_conflicts=False):
+    """Вставка кортежей значений одним executemany
+
+    В отличие от bulk_create не вызывает pre_save, поэтому auto_now_add
+    не перезаписывает переданные даты. С ignore_conflicts строки
+    с занятыми ключами пропускаются.
+    """
+    connection = connections[using]
+    fields = [model._meta.get_field(name) for name in field_names]
+    quote = connection.ops.quote_name
+    sql = '{} {} ({}) VALUES ({}) {}'.format(
+        connection.ops.insert_statement(ignore_conflicts=ignore_conflicts),
+        quote(model._meta.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+        connection.ops.ignore_conflicts_suffix_sql(
+            ignore_conflicts=ignore_conflicts
+        ),
+    ).rstrip()
+    params = [
+        [
+            field.get_db_prep_save(value, connection)
+            for field, value in zip(fields, row)
+        ]
+        for row in rows
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
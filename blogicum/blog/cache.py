@@ -0,0 +1,240 @@
+import time
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Max
+from django.http import HttpResponse
+from django.views.decorators.http import condition
+
+from .models import Post
+from .routers import replica_reads
+
+# Общий тег для редко меняющихся справочников: категорий, локаций и имён
+# пользователей, которые выводятся на всех страницах с публикациями.
+CATALOG_TAG = 'catalog'
+INDEX_TAG = 'index'
+
+
+def get_page_cache():
+    return caches[settings.PAGE_CACHE_ALIAS]
+
+
+def can_store_versioned():
+    """Можно ли сохранить построенное под текущими версиями тегов
+
+    Версии тегов поднимаются сразу после записи в основную базу, а
+    реплика может её ещё не получить: построенное по реплике под новой
+    версией раздавалось бы устаревшим до истечения срока.
+    """
+    return replica_reads.get() is None
+
+
+def _tag_key(tag):
+    return f'tag:{tag}'
+
+
+def get_tag_versions(tags):
+    """Текущие версии тегов; отсутствующие заводятся заново
+
+    Версия — время последнего изменения в наносекундах. Поэтому после
+    вытеснения тега из кэша его версия не совпадёт ни с одной из прежних,
+    а по версиям можно вычислить Last-Modified.
+    """
+    cache = get_page_cache()
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_tags(tags):
+    """Инвалидация всех записей, зависящих от тегов"""
+    if not tags:
+        return
+    cache = get_page_cache()
+    keys = {_tag_key(tag) for tag in tags}
+    now = time.time_ns()
+    current = cache.get_many(keys)
+    cache.set_many(
+        {key: max(now, current.get(key, 0) + 1) for key in keys},
+        timeout=None,
+    )
+
+
+def versions_to_datetime(versions):
+    """Момент последнего изменения по версиям тегов"""
+    return datetime.fromtimestamp(max(versions) / 1e9, tz=dt_timezone.utc)
+
+
+def post_tags(category_slug, author_username, post_id=None):
+    """Теги страниц, на которых выводится публикация"""
+    tags = [INDEX_TAG, f'profile:{author_username}']
+    if category_slug is not None:
+        tags.append(f'category:{category_slug}')
+    if post_id is not None:
+        tags.append(f'post:{post_id}')
+    return tags
+
+
+def stored_post_tags(post_id):
+    """Теги страниц поста по его состоянию в базе данных"""
+    row = Post.objects.filter(pk=post_id).values_list(
+        'category__slug', 'author__username'
+    ).first()
+    if row is None:
+        return []
+    return post_tags(*row, post_id=post_id)
+
+
+def anonymous_page_cache(*tag_templates, shared=None):
+    """Кэширование готовых страниц для неавторизованных посетителей
+
+    Шаблоны тегов форматируются аргументами URL, например
+    'category:{category_slug}'. Тег справочников добавляется всегда.
+    В режимах PAGE_PERSONALIZATION 'client' и 'edge' страница общая
+    и для авторизованных пользователей, если shared(request, **kwargs)
+    не вернёт False. Ответы с Cache-Control: private не сохраняются.
+
+    Такая страница выводит разметку blog.holes вместо данных
+    пользователя: request.shared_page включает её в шаблонах, а
+    response.shared_page отмечает ответ для подстановки в
+    EdgePersonalizationMiddleware.
+    """
+    def cacheable(request, kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return False
+        if not request.user.is_authenticated:
+            return True
+        if settings.PAGE_PERSONALIZATION == 'server':
+            return False
+        return shared is None or shared(request, **kwargs)
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not cacheable(request, kwargs):
+                return view_func(request, *args, **kwargs)
+            request.shared_page = (
+                settings.PAGE_PERSONALIZATION != 'server'
+            )
+
+            tags = [template.format(**kwargs) for template in tag_templates]
+            versions = get_tag_versions([*tags, CATALOG_TAG])
+            path_hash = md5(request.get_full_path().encode()).hexdigest()
+            key = 'page:{}:{}'.format(
+                path_hash, '.'.join(str(version) for version in versions)
+            )
+            cache = get_page_cache()
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+                response.shared_page = request.shared_page
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            response.shared_page = request.shared_page
+            if (
+                can_store_versioned()
+                and response.status_code == 200
+                and not response.streaming
+                and not response.cookies
+                and 'private' not in response.get('Cache-Control', '')
+            ):
+                cache.set(
+                    key,
+                    (response.content, response['Content-Type']),
+                    timeout=settings.PAGE_CACHE_TIMEOUT,
+                )
+            return response
+        return wrapper
+    return decorator
+
+
+def conditional_page(*tag_templates, last_modified=None):
+    """Условный GET по ETag и Last-Modified без выполнения представления
+
+    ETag строится из версий тегов страницы, пользователя и CSRF-куки.
+    Last-Modified отдаётся только анонимным посетителям: дата не учитывает
+    вход и выход пользователя.
+    Функция last_modified(request, **kwargs) возвращает дату изменения
+    данных страницы, которая сравнивается с датами тегов. Страница,
+    построенная по реплике, валидаторов не получает: её данные могут
+    быть старше версий тегов.
+    """
+    def tags_for(kwargs):
+        return [
+            *(template.format(**kwargs) for template in tag_templates),
+            CATALOG_TAG,
+        ]
+
+    def etag_func(request, *args, **kwargs):
+        if not can_store_versioned():
+            return None
+        versions = get_tag_versions(tags_for(kwargs))
+        user = request.user
+        parts = (
+            request.get_full_path(),
+            user.pk if user.is_authenticated else None,
+            request.META.get('CSRF_COOKIE', ''),
+            versions,
+        )
+        return md5(repr(parts).encode()).hexdigest()
+
+    def last_modified_func(request, *args, **kwargs):
+        if request.user.is_authenticated or not can_store_versioned():
+            return None
+        modified = versions_to_datetime(get_tag_versions(tags_for(kwargs)))
+        if last_modified is not None:
+            data_modified = last_modified(request, **kwargs)
+            if data_modified is not None:
+                modified = max(modified, data_modified)
+        return modified
+
+    return condition(
+        etag_func=etag_func,
+        last_modified_func=last_modified_func,
+    )
+
+
+def latest_publication(request, **kwargs):
+    """Дата самой свежей вышедшей публикации
+
+    Один MAX() по частичному индексу; результат живёт до изменения
+    постов, в том числе до открытия отложенной публикации.
+    """
+    cache = get_page_cache()
+    key = 'latest_publication:{}'.format(*get_tag_versions([INDEX_TAG]))
+    cached = cache.get(key)
+    if cached is not None:
+        return cached[0]
+    latest = Post.objects.filter(
+        is_published=True,
+        is_released=True,
+    ).aggregate(latest=Max('pub_date'))['latest']
+    if can_store_versioned():
+        cache.set(key, (latest,), timeout=settings.PAGE_CACHE_TIMEOUT)
+    return latest
+
+
+def post_updated_at(request, post_id, **kwargs):
+    """Дата изменения поста из updated_at, кэшируемая по версии поста"""
+    cache = get_page_cache()
+    key = 'post_updated_at:{}:{}'.format(
+        post_id, *get_tag_versions([f'post:{post_id}'])
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        return cached[0]
+    updated_at = Post.objects.filter(pk=post_id).values_list(
+        'updated_at', flat=True
+    ).first()
+    if can_store_versioned():
+        cache.set(key, (updated_at,), timeout=settings.PAGE_CACHE_TIMEOUT)
+    return updated_at
@@ -0,0 +1,15 @@
+from django.conf import settings
+
+
+def personalization(request):
+    """Подключение js/session.js к общим страницам в режиме 'client'
+
+    В режиме 'edge' данные пользователя на общих страницах подставляет
+    blog.middleware.EdgePersonalizationMiddleware.
+    """
+    return {
+        'client_personalization': (
+            settings.PAGE_PERSONALIZATION == 'client'
+            and getattr(request, 'shared_page', False)
+        ),
+    }
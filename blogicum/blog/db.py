@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def apply_sqlite_pragmas(raw_connection, pragmas):
+    """Выполнение PRAGMA напрямую на соединении sqlite3
+
+    Запросы идут мимо курсоров Django, поэтому не попадают в счётчики
+    QueryBudgetMiddleware и журнал запросов.
+    """
+    for name, value in pragmas.items():
+        raw_connection.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """Профиль нового соединения SQLite из настройки SQLITE_PRAGMAS"""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = connection.settings_dict.get(
+        'PRAGMAS', getattr(settings, 'SQLITE_PRAGMAS', {})
+    )
+    apply_sqlite_pragmas(connection.connection, pragmas)
@@ -0,0 +1,105 @@
+import re
+
+from django.middleware.csrf import get_token
+from django.urls import reverse
+from django.utils.html import escape, format_html
+
+# Разметка общих страниц, одна для EdgePersonalizationMiddleware и
+# js/session.js; её выводят теги из blog.templatetags.personalization.
+# Участок для части посетителей: <template data-only="user">,
+# data-only="guest" или data-only="owner" data-owner="имя". Содержимое
+# <template> браузер не показывает, пока его не вставит session.js.
+# Участки не вкладываются друг в друга.
+REGION_RE = re.compile(
+    rb'<template data-only="(\w+)"(?: data-owner="([^"]*)")?>'
+    rb'(.*?)</template>',
+    re.S,
+)
+# Место для данных пользователя, в том числе в значении атрибута:
+# <!--hole:имя-->.
+HOLE_RE = re.compile(rb'<!--hole:(\w+)-->')
+
+
+def _username(request):
+    return escape(request.user.username)
+
+
+def _profile_url(request):
+    return escape(reverse('blog:profile', args=[request.user.username]))
+
+
+def _csrf_token(request):
+    return format_html(
+        '<input type="hidden" name="csrfmiddlewaretoken" value="{}">',
+        get_token(request),
+    )
+
+
+HOLES = {
+    'username': _username,
+    'profile_url': _profile_url,
+    'csrf_token': _csrf_token,
+}
+
+
+def region_markup(audience, argument, body):
+    """Участок общей страницы для части посетителей"""
+    if audience == 'owner':
+        return format_html(
+            '<template data-only="owner" data-owner="{}">{}</template>',
+            argument,
+            body,
+        )
+    return format_html(
+        '<template data-only="{}">{}</template>', audience, body
+    )
+
+
+def hole_markup(name):
+    """Место для данных пользователя на общей странице"""
+    return format_html('<!--hole:{}-->', name)
+
+
+def region_visible(user, audience, argument):
+    """Виден ли участок страницы пользователю"""
+    if audience == 'guest':
+        return not user.is_authenticated
+    if not user.is_authenticated:
+        return False
+    if audience == 'owner':
+        return argument == escape(user.username)
+    return audience == 'user'
+
+
+def splice(content, request):
+    """Подстановка фрагментов пользователя в общую для всех страницу
+
+    Страница рендерится и кэшируется один раз, а здесь только выбрасываются
+    чужие участки и заполняются места для данных пользователя: несколько
+    проходов регулярных выражений вместо рендера шаблонов.
+    """
+    if b'data-only' not in content and b'<!--hole:' not in content:
+        return content
+
+    def keep(match):
+        audience, argument, body = match.groups()
+        visible = region_visible(
+            request.user,
+            audience.decode(),
+            (argument or b'').decode(),
+        )
+        return body if visible else b''
+
+    filled = {}
+
+    def fill(match):
+        name = match.group(1)
+        hole = HOLES.get(name.decode())
+        if hole is None:
+            # Неизвестное место не ломает страницу и остаётся как есть.
+            return match.group(0)
+        if name not in filled:
+            filled[name] = hole(request).encode()
+        return filled[name]
+
+    return HOLE_RE.sub(fill, REGION_RE.sub(keep, content))
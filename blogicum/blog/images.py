@@ -0,0 +1,95 @@
+import os
+from hashlib import md5
+
+from django.core.files.storage import default_storage
+
+# Ширины вариантов фото публикации: карточка ленты занимает 40rem,
+# страница поста получает вариант вдвое шире для экранов высокой плотности.
+VARIANT_WIDTHS = {
+    'card': 640,
+    'detail': 1280,
+}
+VARIANT_FORMATS = {
+    'webp': ('webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+VARIANTS_DIR = 'post_images/variants'
+
+
+def variant_stem(post_id, source_name):
+    """Общая часть имён файлов вариантов конкретного исходника"""
+    digest = md5(source_name.encode()).hexdigest()[:8]
+    return f'{post_id}-{digest}'
+
+
+def render_variants(source_path, target_dir, stem):
+    """Нарезка вариантов одного фото; выполняется в дочернем процессе
+
+    Работает только с файловой системой и не обращается к базе данных.
+    Возвращает словарь {вид: {'width', 'height', формат: имя файла}},
+    файлы прежних исходников того же поста удаляются.
+    """
+    from PIL import Image, ImageOps
+
+    os.makedirs(target_dir, exist_ok=True)
+    post_prefix = stem.split('-')[0] + '-'
+    for filename in os.listdir(target_dir):
+        if filename.startswith(post_prefix) and not filename.startswith(stem):
+            os.remove(os.path.join(target_dir, filename))
+
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGBA').convert('RGB')
+        variants = {}
+        for kind, width in VARIANT_WIDTHS.items():
+            width = min(width, image.width)
+            height = max(round(image.height * width / image.width), 1)
+            resized = image
+            if (width, height) != image.size:
+                resized = image.resize((width, height), Image.LANCZOS)
+            variant = {'width': width, 'height': height}
+            for image_format, (extension, params) in VARIANT_FORMATS.items():
+                filename = f'{stem}-{kind}.{extension}'
+                resized.save(
+                    os.path.join(target_dir, filename),
+                    format=image_format.upper(),
+                    **params,
+                )
+                variant[image_format] = f'{VARIANTS_DIR}/{filename}'
+            variants[kind] = variant
+    return variants
+
+
+def _srcset(variants, image_format):
+    candidates = {}
+    for variant in variants.values():
+        candidates.setdefault(
+            variant['width'], default_storage.url(variant[image_format])
+        )
+    return ', '.join(
+        f'{url} {width}w' for width, url in sorted(candidates.items())
+    )
+
+
+def image_variant(post, kind):
+    """Данные для <picture> или None, пока варианты не готовы
+
+    Варианты, нарезанные из прежнего фото, не используются.
+    """
+    data = post.image_variants
+    if (
+        not post.image
+        or data.get('source') != post.image.name
+        or kind not in data.get('variants', {})
+    ):
+        return None
+    variants = data['variants']
+    variant = variants[kind]
+    return {
+        'src': default_storage.url(variant['jpeg']),
+        'width': variant['width'],
+        'height': variant['height'],
+        'webp_srcset': _srcset(variants, 'webp'),
+        'jpeg_srcset': _srcset(variants, 'jpeg'),
+    }
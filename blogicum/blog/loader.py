@@ -0,0 +1,118 @@
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.fields.related_descriptors import (
+    ForwardManyToOneDescriptor
+)
+from django.db.models.signals import post_init
+
+# Загрузчик текущего запроса; вне IdentityMapMiddleware связи
+# загружаются обычным способом, по запросу на объект.
+current_loader = ContextVar('current_loader', default=None)
+
+# Внешние ключи, обращения к которым собираются в пачки.
+BATCHED_FIELDS = {
+    'blog.Post': ('author', 'category', 'location'),
+    'blog.Comment': ('author', 'post'),
+}
+
+
+class RelatedLoader:
+    """Карта идентичности и пакетная загрузка связанных объектов
+
+    Все экземпляры моделей из BATCHED_FIELDS, созданные за время
+    запроса, ждут загрузки своих связей. При первом обращении к связи
+    одного из них объекты для всех ожидающих загружаются одним
+    запросом pk IN (...), а уже загруженные берутся из карты
+    идентичности, так что один пользователь или категория
+    запрашиваются за запрос один раз. Очередь хранит слабые ссылки:
+    экземпляры, которые представление уже отпустило, не доживают
+    до конца запроса из-за загрузчика.
+    """
+
+    def __init__(self):
+        self.identity_map = {}
+        self.pending = {}
+
+    def register(self, instance):
+        for name in BATCHED_FIELDS[instance._meta.label]:
+            self.pending.setdefault(
+                (type(instance), name), []
+            ).append(weakref.ref(instance))
+
+    def load(self, descriptor, instance):
+        field = descriptor.field
+        model = field.related_model
+        queued = self.pending.pop((type(instance), field.name), [])
+        waiting = [ref() for ref in queued]
+        waiting.append(instance)
+        waiting = [
+            obj for obj in waiting
+            if obj is not None
+            and not descriptor.is_cached(obj)
+            and getattr(obj, field.attname) is not None
+        ]
+        known = self.identity_map.setdefault(model, {})
+        missing = {
+            getattr(obj, field.attname) for obj in waiting
+        } - known.keys()
+        if missing:
+            related = descriptor.get_queryset(instance=instance).filter(
+                pk__in=missing,
+            )
+            for obj in related:
+                known[obj.pk] = obj
+        for obj in waiting:
+            related = known.get(getattr(obj, field.attname))
+            if related is not None:
+                field.set_cached_value(obj, related)
+
+
+class BatchedForwardDescriptor(ForwardManyToOneDescriptor):
+    """Доступ к внешнему ключу через загрузчик текущего запроса"""
+
+    def __get__(self, instance, cls=None):
+        if instance is not None and not self.is_cached(instance):
+            loader = current_loader.get()
+            if loader is not None:
+                loader.load(self, instance)
+        return super().__get__(instance, cls)
+
+
+@contextmanager
+def batched_loading():
+    """Загрузчик на время блока; карта очищается при выходе"""
+    token = current_loader.set(RelatedLoader())
+    try:
+        yield
+    finally:
+        current_loader.reset(token)
+
+
+def _register_instance(sender, instance, **kwargs):
+    loader = current_loader.get()
+    if loader is not None:
+        loader.register(instance)
+
+
+def install():
+    """Замена дескрипторов внешних ключей; вызывается из ready()
+
+    Вне batched_loading() новые дескрипторы ведут себя как стандартные.
+    """
+    from django.apps import apps
+
+    for label, names in BATCHED_FIELDS.items():
+        model = apps.get_model(label)
+        for name in names:
+            setattr(
+                model,
+                name,
+                BatchedForwardDescriptor(model._meta.get_field(name)),
+            )
+        post_init.connect(
+            _register_instance,
+            sender=model,
+            dispatch_uid=f'batched_loading:{label}',
+        )
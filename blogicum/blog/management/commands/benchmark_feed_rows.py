@@ -0,0 +1,71 @@
+import io
+import json
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases,
+    teardown_test_environment
+)
+
+from blog.benchmarks import feed_materialization
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает построение страницы ленты из экземпляров Post '
+        'и из строк PostRow во временной тестовой базе'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts',
+            type=int,
+            default=2000,
+            help='Количество публикаций в наборе данных.',
+        )
+        parser.add_argument(
+            '--per-page',
+            type=int,
+            default=100,
+            help='Сколько карточек строить за один замер.',
+        )
+        parser.add_argument(
+            '--repeats',
+            type=int,
+            default=30,
+            help='Сколько раз повторять каждый замер.',
+        )
+        parser.add_argument(
+            '--output',
+            default='bench_feed_rows.json',
+            help='Куда записать результаты в JSON.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        setup_test_environment(debug=False)
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            call_command(
+                'generate_dataset',
+                users=100,
+                posts=options['posts'],
+                comments=0,
+                image_ratio=0.3,
+                seed=options['seed'],
+                stdout=io.StringIO(),
+            )
+            results = feed_materialization(
+                per_page=options['per_page'],
+                repeats=options['repeats'],
+            )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        for name, metrics in results.items():
+            self.stdout.write(f'{name:<7} {metrics}')
+        with open(options['output'], 'w', encoding='utf-8') as target:
+            json.dump(results, target, ensure_ascii=False, indent=2)
+        self.stdout.write(f'Результаты записаны в {options["output"]}')
@@ -0,0 +1,101 @@
+import io
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases,
+    teardown_test_environment
+)
+
+from blog.benchmarks import DEFAULT_SQLITE_PRAGMAS, mixed_workload
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность смешанной нагрузки на SQLite '
+        'с профилем по умолчанию и с рабочим профилем соединения'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts',
+            type=int,
+            default=5000,
+            help='Количество публикаций в наборе данных.',
+        )
+        parser.add_argument(
+            '--readers',
+            type=int,
+            default=4,
+            help='Количество читающих потоков.',
+        )
+        parser.add_argument(
+            '--writers',
+            type=int,
+            default=2,
+            help='Количество пишущих потоков.',
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=10,
+            help='Длительность прогона каждого профиля в секундах.',
+        )
+        parser.add_argument(
+            '--output',
+            default='bench_sqlite.json',
+            help='Куда записать результаты в JSON.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Замер рассчитан только на SQLite.')
+        profiles = (
+            ('before', DEFAULT_SQLITE_PRAGMAS, False),
+            ('after', settings.SQLITE_PRAGMAS, True),
+        )
+        # Потокам нужна общая база в файле: в памяти нет журнала WAL.
+        with tempfile.TemporaryDirectory() as directory:
+            connection.settings_dict['TEST']['NAME'] = os.path.join(
+                directory, 'benchmark.sqlite3'
+            )
+            setup_test_environment(debug=False)
+            old_config = setup_databases(verbosity=0, interactive=False)
+            try:
+                get_user_model().objects.create_user('benchmark')
+                call_command(
+                    'generate_dataset',
+                    users=100,
+                    posts=options['posts'],
+                    comments=options['posts'] * 10,
+                    image_ratio=0,
+                    seed=options['seed'],
+                    stdout=io.StringIO(),
+                )
+                results = {}
+                for name, pragmas, persistent in profiles:
+                    connections.close_all()
+                    connection.settings_dict['PRAGMAS'] = pragmas
+                    results[name] = mixed_workload(
+                        readers=options['readers'],
+                        writers=options['writers'],
+                        duration=options['duration'],
+                        persistent=persistent,
+                    )
+                    self.stdout.write(f'{name:<7} {results[name]}')
+            finally:
+                connections.close_all()
+                connection.settings_dict.pop('PRAGMAS', None)
+                teardown_databases(old_config, verbosity=0)
+                teardown_test_environment()
+
+        with open(options['output'], 'w', encoding='utf-8') as target:
+            json.dump(results, target, ensure_ascii=False, indent=2)
+        self.stdout.write(f'Результаты записаны в {options["output"]}')
@@ -0,0 +1,110 @@
+import json
+import platform
+from datetime import datetime
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases,
+    teardown_test_environment
+)
+
+from blog.benchmarks import check_scaling, compare, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет представления блога на наборах данных возрастающего '
+        'размера во временной тестовой базе'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales',
+            nargs='+',
+            type=int,
+            default=[1000, 10000, 100000],
+            help='Размеры наборов в публикациях; комментариев в десять '
+            'раз больше.',
+        )
+        parser.add_argument(
+            '--repeats',
+            type=int,
+            default=30,
+            help='Сколько раз замерять каждое представление.',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=3,
+            help='Сколько запросов выполнить до замеров.',
+        )
+        parser.add_argument(
+            '--output',
+            default='bench_views.json',
+            help='Куда записать результаты в JSON.',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON прошлого прогона для сравнения.',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=1.5,
+            help='Во сколько раз медиана может превысить базовую.',
+        )
+        parser.add_argument(
+            '--max-growth',
+            type=float,
+            default=3,
+            help='Во сколько раз медиана может вырасти от меньшего набора '
+            'к большему.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as source:
+                baseline = json.load(source)['results']
+
+        setup_test_environment(debug=False)
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            user = get_user_model().objects.create_user('benchmark')
+            results = run_benchmarks(
+                options['scales'],
+                user,
+                repeats=options['repeats'],
+                warmup=options['warmup'],
+                seed=options['seed'],
+                log=self.stdout.write,
+            )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'meta': {
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'scales': sorted(options['scales']),
+                'repeats': options['repeats'],
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as target:
+            json.dump(report, target, ensure_ascii=False, indent=2)
+        self.stdout.write(f'Результаты записаны в {options["output"]}')
+
+        regressions = check_scaling(results, options['max_growth'])
+        if baseline is not None:
+            regressions += compare(results, baseline, options['tolerance'])
+        if regressions:
+            raise CommandError(
+                'Обнаружены регрессии:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
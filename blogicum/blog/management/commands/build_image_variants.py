@@ -0,0 +1,109 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from blog.cache import bump_tags, stored_post_tags
+from blog.images import VARIANTS_DIR, render_variants, variant_stem
+from blog.models import Post
+
+
+def _render_job(job):
+    post_id, source_name, source_path, target_dir = job
+    try:
+        variants = render_variants(
+            source_path, target_dir, variant_stem(post_id, source_name)
+        )
+    except Exception as error:
+        return post_id, source_name, {
+            'source': source_name,
+            'error': f'{type(error).__name__}: {error}',
+        }
+    return post_id, source_name, {
+        'source': source_name,
+        'variants': variants,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Нарезает уменьшенные варианты фото публикаций'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Число процессов для обработки фото; по умолчанию '
+            'по числу ядер.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Сколько постов забирать из очереди за один раз.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Разобрать очередь один раз и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        # Дочерние процессы не должны унаследовать открытые соединения.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            try:
+                while True:
+                    processed = self.process_batch(pool, options)
+                    if options['once'] and not processed:
+                        break
+                    if not processed:
+                        time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                pass
+
+    def process_batch(self, pool, options):
+        """Обработка одной пачки постов; возвращает их количество
+
+        В очереди — посты с фото и пустыми вариантами: так сохраняются
+        новые посты, а при замене фото варианты сбрасывает Post.save.
+        """
+        batch = list(
+            Post.objects.exclude(image='').filter(
+                image_variants={},
+            ).order_by('pk').values_list('pk', 'image')[:options['batch_size']]
+        )
+        if not batch:
+            return 0
+        target_dir = default_storage.path(VARIANTS_DIR)
+        jobs = [
+            (post_id, name, default_storage.path(name), target_dir)
+            for post_id, name in batch
+        ]
+        done = failed = 0
+        for post_id, source_name, data in pool.map(_render_job, jobs):
+            # Условие по фото не даёт записать варианты поверх нового фото,
+            # загруженного, пока шла обработка.
+            updated = Post.objects.filter(
+                pk=post_id, image=source_name,
+            ).update(image_variants=data)
+            if not updated:
+                continue
+            bump_tags(stored_post_tags(post_id))
+            if 'error' in data:
+                failed += 1
+                self.stderr.write(f'Пост {post_id}: {data["error"]}')
+            else:
+                done += 1
+        self.stdout.write(
+            f'Обработано фото: {done}, с ошибкой: {failed}.'
+        )
+        return len(batch)
@@ -0,0 +1,113 @@
+import time
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.models import OutboxMessage
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящих сообщений'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Сколько писем забирать из очереди за один раз.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=5,
+            help='После стольких неудач письмо помечается неотправленным.',
+        )
+        parser.add_argument(
+            '--backoff',
+            type=float,
+            default=30,
+            help='Базовая задержка повтора в секундах; удваивается '
+            'с каждой неудачей.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Разобрать очередь один раз и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        try:
+            while True:
+                delivered = self.deliver_batch(connection, options)
+                if options['once'] and not delivered:
+                    break
+                if not delivered:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+
+    def deliver_batch(self, connection, options):
+        """Отправка одной пачки писем; возвращает их количество
+
+        Письма отправляются вне транзакции, чтобы блокировка записи
+        в SQLite не задерживала создание постов на время отправки.
+        Рассчитано на один экземпляр обработчика.
+        """
+        batch = list(
+            OutboxMessage.objects.filter(
+                status=OutboxMessage.PENDING,
+                next_attempt_at__lte=timezone.now(),
+            ).order_by('next_attempt_at')[:options['batch_size']]
+        )
+        if not batch:
+            return 0
+        sent = failed = 0
+        for message in batch:
+            email = EmailMessage(
+                subject=message.subject,
+                body=message.body,
+                from_email=message.from_email,
+                to=message.recipients,
+                connection=connection,
+            )
+            try:
+                connection.open()
+                connection.send_messages([email])
+            except Exception as error:
+                connection.close()
+                self.schedule_retry(message, error, options)
+                failed += 1
+            else:
+                message.status = OutboxMessage.SENT
+                message.sent_at = timezone.now()
+                message.attempts += 1
+                message.save(update_fields=('status', 'sent_at', 'attempts'))
+                sent += 1
+        self.stdout.write(
+            f'Отправлено писем: {sent}, с ошибкой: {failed}.'
+        )
+        return len(batch)
+
+    def schedule_retry(self, message, error, options):
+        message.attempts += 1
+        message.last_error = f'{type(error).__name__}: {error}'
+        if message.attempts >= options['max_attempts']:
+            message.status = OutboxMessage.FAILED
+        else:
+            message.next_attempt_at = timezone.now() + timedelta(
+                seconds=options['backoff'] * 2 ** (message.attempts - 1)
+            )
+        message.save(update_fields=(
+            'attempts', 'last_error', 'status', 'next_attempt_at'
+        ))
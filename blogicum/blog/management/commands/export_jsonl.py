@@ -0,0 +1,78 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.bulk_io import (
+    EXPORT_CHUNK_SIZE, EXPORT_MODELS, iter_export, open_text,
+    parse_checkpoint
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает категории, локации, посты и комментарии в JSON Lines '
+        'с постоянным расходом памяти'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output',
+            help='Файл выгрузки; с расширением .gz сжимается на лету, '
+            '«-» — стандартный вывод.',
+        )
+        parser.add_argument(
+            '--models',
+            nargs='+',
+            choices=EXPORT_MODELS,
+            default=EXPORT_MODELS,
+            help='Какие модели выгружать.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help='Количество объектов, читаемых из базы за один запрос.',
+        )
+        parser.add_argument(
+            '--resume-from',
+            help='Контрольная точка вида blog.post:1234 из вывода прерванной '
+            'выгрузки; строки дописываются в конец файла.',
+        )
+
+    def handle(self, *args, **options):
+        checkpoint = None
+        if options['resume_from']:
+            try:
+                checkpoint = parse_checkpoint(options['resume_from'])
+            except ValueError as error:
+                raise CommandError(error) from error
+            if checkpoint[0] not in options['models']:
+                raise CommandError(
+                    'Модель контрольной точки не входит в выгрузку.'
+                )
+        lines = iter_export(
+            options['models'], checkpoint, options['chunk_size']
+        )
+        if options['output'] == '-':
+            self.write(lines, sys.stdout, options['chunk_size'])
+            return
+        mode = 'at' if checkpoint is not None else 'wt'
+        with open_text(options['output'], mode) as output:
+            self.write(lines, output, options['chunk_size'])
+
+    def write(self, lines, output, chunk_size):
+        """Запись строк с отчётом о контрольной точке после каждой пачки"""
+        written = 0
+        label = pk = None
+        try:
+            for label, pk, line in lines:
+                output.write(line)
+                written += 1
+                if written % chunk_size == 0:
+                    output.flush()
+                    self.stderr.write(f'Контрольная точка: {label}:{pk}')
+        finally:
+            output.flush()
+            if label is not None:
+                self.stderr.write(f'Контрольная точка: {label}:{pk}')
+        self.stderr.write(self.style.SUCCESS(f'Выгружено объектов: {written}'))
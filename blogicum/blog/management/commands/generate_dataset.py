@@ -0,0 +1,327 @@
+import os
+import random
+from bisect import bisect
+from datetime import timedelta
+from itertools import accumulate
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from blog.bulk_io import insert_rows
+from blog.cache import get_page_cache
+from blog.models import Category, Comment, Location, Post
+from blog.reading import text_summary
+
+User = get_user_model()
+
+GENERATED_IMAGES_DIR = 'post_images/generated'
+TEXT_POOL_SIZE = 2000
+
+POST_FIELDS = (
+    'title', 'text', 'pub_date', 'author', 'location', 'category',
+    'is_published', 'created_at', 'updated_at', 'image', 'comment_count',
+    'image_variants', 'is_released', 'excerpt', 'word_count',
+    'reading_time',
+)
+COMMENT_FIELDS = ('post', 'author', 'text', 'created_at')
+
+
+def zipf_cum_weights(count, exponent):
+    """Накопленные веса закона Ципфа: k-й элемент в k^s раз реже первого"""
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+def values(rows, field_names):
+    """Кортежи значений для insert_rows из строк-словарей"""
+    return [tuple(row[name] for name in field_names) for row in rows]
+
+
+def pick(rng, items, cum_weights):
+    """Случайный элемент с заданными накопленными весами"""
+    return items[bisect(cum_weights, rng.random() * cum_weights[-1])]
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, публикациями '
+        'и комментариями с неравномерными распределениями'
+    )
+
+    def add_arguments(self, parser):
+        volumes = (
+            ('--users', 1000, 'Количество пользователей.'),
+            ('--categories', 30, 'Количество категорий.'),
+            ('--locations', 200, 'Количество местоположений.'),
+            ('--posts', 100000, 'Количество публикаций.'),
+            ('--comments', 1000000, 'Количество комментариев.'),
+        )
+        for option, default, help_text in volumes:
+            parser.add_argument(option, type=int, default=default,
+                                help=help_text)
+        # При нулевом количестве пользователей, категорий или
+        # местоположений новые посты ссылаются на уже имеющиеся.
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=3 * 365,
+            help='За сколько дней распределить даты публикаций.',
+        )
+        parser.add_argument(
+            '--unpublished-ratio',
+            type=float,
+            default=0.05,
+            help='Доля снятых с публикации постов.',
+        )
+        parser.add_argument(
+            '--scheduled-ratio',
+            type=float,
+            default=0.02,
+            help='Доля отложенных публикаций с датой в будущем.',
+        )
+        parser.add_argument(
+            '--image-ratio',
+            type=float,
+            default=0.3,
+            help='Доля публикаций с фото.',
+        )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.1,
+            help='Показатель закона Ципфа для авторов, категорий '
+            'и популярности постов.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Количество строк в одной транзакции.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Зерно генератора для воспроизводимых наборов.',
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.check_sources()
+        self.rng = random.Random(options['seed'])
+        self.fake = Faker('ru_RU')
+        self.fake.seed_instance(options['seed'])
+        self.now = timezone.now()
+        self.sentences = [
+            self.fake.sentence(nb_words=10) for _ in range(TEXT_POOL_SIZE)
+        ]
+
+        users = self.create_users()
+        categories = self.create_categories()
+        locations = self.create_locations()
+        posts = self.create_posts(users, categories, locations)
+        self.create_comments(users, posts)
+
+        call_command('sync_comment_counts', stdout=self.stdout)
+        get_page_cache().clear()
+        self.stdout.write(self.style.SUCCESS('Набор данных создан.'))
+
+    def check_sources(self):
+        """Отказ до генерации, если новым строкам не на что ссылаться"""
+        options = self.options
+        sources = []
+        if options['posts'] or options['comments']:
+            sources.append(('users', User))
+        if options['posts']:
+            sources.append(('categories', Category))
+        if options['comments']:
+            sources.append(('posts', Post))
+        for option, model in sources:
+            if not options[option] and not model.objects.exists():
+                raise CommandError(
+                    f'При --{option} 0 нужны уже имеющиеся объекты '
+                    f'«{model._meta.verbose_name_plural}», а в базе '
+                    f'их нет.'
+                )
+
+    def batches(self, total):
+        batch_size = self.options['batch_size']
+        for start in range(0, total, batch_size):
+            yield range(start, min(start + batch_size, total))
+
+    def new_pks(self, model, previous_max):
+        return list(
+            model.objects.filter(pk__gt=previous_max).order_by(
+                'pk'
+            ).values_list('pk', flat=True)
+        )
+
+    def pool(self, model, previous_max):
+        """Созданные объекты, а если их не просили — уже имеющиеся"""
+        pks = self.new_pks(model, previous_max)
+        if not pks:
+            pks = list(model.objects.values_list('pk', flat=True))
+        return pks
+
+    def max_pk(self, model):
+        last = model.objects.order_by('-pk').values_list('pk', flat=True)
+        return last.first() or 0
+
+    def create_users(self):
+        previous_max = self.max_pk(User)
+        prefix = f'gen{self.options["seed"]}_{previous_max}'
+        for batch in self.batches(self.options['users']):
+            User.objects.bulk_create(
+                User(
+                    username=f'{prefix}_{number}',
+                    first_name=self.fake.first_name(),
+                    last_name=self.fake.last_name(),
+                    email=f'{prefix}_{number}@blogicum.not',
+                    password='!',
+                )
+                for number in batch
+            )
+        self.stdout.write(f'Пользователей: {self.options["users"]}')
+        return self.pool(User, previous_max)
+
+    def create_categories(self):
+        previous_max = self.max_pk(Category)
+        Category.objects.bulk_create(
+            Category(
+                title=self.fake.word().capitalize(),
+                description=self.rng.choice(self.sentences),
+                slug=f'gen-{previous_max}-{number}',
+                is_published=self.rng.random() > 0.1,
+            )
+            for number in range(self.options['categories'])
+        )
+        return self.pool(Category, previous_max)
+
+    def create_locations(self):
+        previous_max = self.max_pk(Location)
+        Location.objects.bulk_create(
+            Location(
+                name=self.fake.city(),
+                is_published=self.rng.random() > 0.1,
+            )
+            for _ in range(self.options['locations'])
+        )
+        return self.pool(Location, previous_max)
+
+    def generate_images(self, count=10):
+        """Несколько фото-заглушек, общих для всех постов с фото"""
+        from PIL import Image
+
+        directory = os.path.join(settings.MEDIA_ROOT, GENERATED_IMAGES_DIR)
+        os.makedirs(directory, exist_ok=True)
+        names = []
+        for number in range(count):
+            name = f'{GENERATED_IMAGES_DIR}/placeholder-{number}.jpg'
+            color = tuple(self.rng.randrange(256) for _ in range(3))
+            Image.new('RGB', (1600, 1000), color).save(
+                os.path.join(settings.MEDIA_ROOT, name), quality=85
+            )
+            names.append(name)
+        return names
+
+    def post_row(self, authors, categories, locations, images):
+        """Случайная публикация; свежих постов больше, чем старых"""
+        options = self.options
+        rng = self.rng
+        if rng.random() < options['scheduled_ratio']:
+            pub_date = self.now + timedelta(days=rng.random() * 30)
+        else:
+            pub_date = self.now - timedelta(
+                days=options['days'] * rng.random() ** 2
+            )
+        created_at = min(pub_date, self.now) - timedelta(
+            hours=rng.random() * 24
+        )
+        paragraphs = rng.randint(1, 6)
+        text = '\n\n'.join(
+            ' '.join(rng.choices(self.sentences, k=rng.randint(2, 8)))
+            for _ in range(paragraphs)
+        )
+        image = ''
+        if images and rng.random() < options['image_ratio']:
+            image = rng.choice(images)
+        excerpt, word_count, reading_time = text_summary(text)
+        return {
+            'title': rng.choice(self.sentences)[:256],
+            'text': text,
+            'pub_date': pub_date,
+            'author': pick(rng, *authors),
+            'location': rng.choice(locations)
+            if locations and rng.random() < 0.7 else None,
+            'category': pick(rng, *categories),
+            'is_published': rng.random() >= options['unpublished_ratio'],
+            'created_at': created_at,
+            'updated_at': created_at,
+            'image': image,
+            'comment_count': 0,
+            'image_variants': {},
+            'is_released': pub_date <= self.now,
+            'excerpt': excerpt,
+            'word_count': word_count,
+            'reading_time': reading_time,
+        }
+
+    def create_posts(self, users, categories, locations):
+        """Публикации; возвращает пары (pk, дата публикации)
+
+        Если новых публикаций не просили, возвращаются уже имеющиеся.
+        """
+        skew = self.options['skew']
+        authors = (users, zipf_cum_weights(len(users), skew))
+        categories = (categories, zipf_cum_weights(len(categories), skew))
+        images = []
+        if self.options['image_ratio'] > 0:
+            images = self.generate_images()
+        previous_max = self.max_pk(Post)
+        pub_dates = []
+        for batch in self.batches(self.options['posts']):
+            rows = [
+                self.post_row(authors, categories, locations, images)
+                for _ in batch
+            ]
+            pub_dates.extend(row['pub_date'] for row in rows)
+            with transaction.atomic():
+                insert_rows(Post, POST_FIELDS, values(rows, POST_FIELDS))
+            self.stdout.write(f'Публикаций: {batch.stop}')
+        if not pub_dates:
+            return list(Post.objects.values_list('pk', 'pub_date'))
+        return list(zip(self.new_pks(Post, previous_max), pub_dates))
+
+    def create_comments(self, users, posts):
+        """Комментарии: популярные посты собирают большую часть"""
+        rng = self.rng
+        skew = self.options['skew']
+        authors = (users, zipf_cum_weights(len(users), skew))
+        # Популярность не зависит от порядка создания постов.
+        rng.shuffle(posts)
+        popular = (posts, zipf_cum_weights(len(posts), skew))
+        for batch in self.batches(self.options['comments']):
+            rows = []
+            for _ in batch:
+                post_id, pub_date = pick(rng, *popular)
+                # Обсуждение затухает экспоненциально после публикации.
+                created_at = min(pub_date, self.now) + timedelta(
+                    hours=rng.expovariate(1 / 48)
+                )
+                rows.append({
+                    'post': post_id,
+                    'author': pick(rng, *authors),
+                    'text': rng.choice(self.sentences),
+                    'created_at': min(created_at, self.now),
+                })
+            with transaction.atomic():
+                insert_rows(
+                    Comment, COMMENT_FIELDS, values(rows, COMMENT_FIELDS)
+                )
+            self.stdout.write(f'Комментариев: {batch.stop}')
@@ -0,0 +1,188 @@
+from itertools import islice
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers import python
+from django.db import (
+    DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+)
+
+from blog.bulk_io import (
+    READ_SIZE, insert_rows, iter_dump_records, open_text
+)
+from blog.cache import get_page_cache
+from blog.models import Comment, Post
+from blog.publishing import release_due_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает дамп в формате dumpdata (db.json) пачками '
+        'INSERT. В отличие от loaddata не перезаписывает существующие '
+        'строки: занятые первичные ключи — ошибка или, с --skip-existing, '
+        'пропуск записи'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='Файл дампа: JSON-массив или JSON Lines, можно сжатый '
+            'gzip (.gz).',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество объектов в одном INSERT.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=20000,
+            help='Количество записей дампа в одной транзакции.',
+        )
+        parser.add_argument(
+            '--read-size',
+            type=int,
+            default=READ_SIZE,
+            help='Размер куска, читаемого из файла за раз, в символах.',
+        )
+        parser.add_argument(
+            '--skip-existing',
+            action='store_true',
+            help='Пропускать записи с уже занятыми первичными ключами '
+            'вместо ошибки. Нужно при загрузке в базу после migrate, '
+            'где уже есть типы содержимого и права доступа.',
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='База данных для загрузки.',
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        connection = connections[using]
+        self.loaded = {}
+        # Проверки внешних ключей откладываются до конца загрузки: записи
+        # могут ссылаться на объекты из следующих кусков дампа.
+        with connection.constraint_checks_disabled():
+            with open_text(options['path']) as stream:
+                records = iter_dump_records(stream, options['read_size'])
+                while True:
+                    chunk = list(islice(records, options['chunk_size']))
+                    if not chunk:
+                        break
+                    try:
+                        with transaction.atomic(using=using):
+                            self.load_chunk(chunk, options)
+                    except IntegrityError as error:
+                        raise CommandError(
+                            f'Запись дампа конфликтует с существующей: '
+                            f'{error}. Существующие строки не '
+                            f'перезаписываются, их можно пропустить '
+                            f'с --skip-existing.'
+                        ) from error
+                    self.stdout.write(
+                        f'Загружено записей: {sum(self.loaded.values())}'
+                    )
+        models = list(self.loaded)
+        if not models:
+            self.stdout.write('Дамп пуст.')
+            return
+        try:
+            connection.check_constraints(
+                table_names=[model._meta.db_table for model in models]
+            )
+        except Exception as error:
+            raise CommandError(
+                f'Дамп нарушает ссылочную целостность: {error}'
+            ) from error
+        self.reset_sequences(connection, models)
+        self.finish(models)
+
+    def load_chunk(self, records, options):
+        """Группировка записей куска по моделям и вставка пачками"""
+        by_model = {}
+        many_to_many = []
+        objects = python.Deserializer(
+            records,
+            using=options['database'],
+            ignorenonexistent=True,
+        )
+        for deserialized in objects:
+            obj = deserialized.object
+            if isinstance(obj, Post):
+                obj.update_summary()
+            by_model.setdefault(type(obj), []).append(obj)
+            if deserialized.m2m_data:
+                many_to_many.append((obj, deserialized.m2m_data))
+        for model, instances in by_model.items():
+            self.insert(model, instances, options)
+            self.loaded[model] = self.loaded.get(model, 0) + len(instances)
+        if many_to_many:
+            self.load_many_to_many(many_to_many, options)
+
+    def insert(self, model, instances, options):
+        """Вставка объектов со значениями полей из дампа как есть
+
+        bulk_create вызывает pre_save, и auto_now_add заменил бы даты
+        из дампа временем загрузки.
+        """
+        fields = model._meta.local_concrete_fields
+        for start in range(0, len(instances), options['batch_size']):
+            insert_rows(
+                model,
+                [field.name for field in fields],
+                [
+                    [getattr(obj, field.attname) for field in fields]
+                    for obj in instances[start:start + options['batch_size']]
+                ],
+                using=options['database'],
+                ignore_conflicts=options['skip_existing'],
+            )
+
+    def load_many_to_many(self, many_to_many, options):
+        rows = {}
+        for obj, m2m_data in many_to_many:
+            for field_name, values in m2m_data.items():
+                field = obj._meta.get_field(field_name)
+                through = field.remote_field.through
+                source = field.m2m_field_name()
+                target = field.m2m_reverse_field_name()
+                rows.setdefault(through, []).extend(
+                    through(**{f'{source}_id': obj.pk, f'{target}_id': value})
+                    for value in values
+                )
+        for through, instances in rows.items():
+            through.objects.using(options['database']).bulk_create(
+                instances,
+                batch_size=options['batch_size'],
+                ignore_conflicts=True,
+            )
+
+    def reset_sequences(self, connection, models):
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def finish(self, models):
+        """Пересчёт производных данных, которые обходит raw-вставка
+
+        Вставка не отправляет сигналы и не вызывает save(): счётчики
+        комментариев пересчитываются заново, посты с наступившей датой
+        открываются, а кэш страниц сбрасывается целиком.
+        """
+        if Comment in models:
+            call_command('sync_comment_counts', stdout=self.stdout)
+        if Post in models:
+            release_due_posts()
+        get_page_cache().clear()
+        summary = ', '.join(
+            f'{model._meta.label}: {count}'
+            for model, count in self.loaded.items()
+        )
+        self.stdout.write(self.style.SUCCESS(f'Загружено. {summary}.'))
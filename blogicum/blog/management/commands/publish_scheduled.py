@@ -0,0 +1,65 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.publishing import PublicationSchedule, release_due_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Открывает отложенные публикации в момент наступления их даты '
+        'и сбрасывает кэш затронутых лент'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--refresh',
+            type=float,
+            default=10,
+            help='Как часто в секундах перечитывать расписание из базы.',
+        )
+        parser.add_argument(
+            '--horizon',
+            type=float,
+            default=3600,
+            help='На сколько секунд вперёд держать таймеры в памяти.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Открыть наступившие публикации и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            self.release(timezone.now())
+            return
+        schedule = PublicationSchedule(timedelta(seconds=options['horizon']))
+        refresh = timedelta(seconds=options['refresh'])
+        refresh_at = timezone.now()
+        try:
+            while True:
+                now = timezone.now()
+                if now >= refresh_at:
+                    # Заодно открываются посты, загруженные в обход save().
+                    self.release(now)
+                    schedule.load(now)
+                    refresh_at = now + refresh
+                elif schedule.pop_due(now):
+                    self.release(now)
+                wake_at = refresh_at
+                next_timer = schedule.next_timer()
+                if next_timer is not None:
+                    wake_at = min(wake_at, next_timer)
+                time.sleep(
+                    max((wake_at - timezone.now()).total_seconds(), 0)
+                )
+        except KeyboardInterrupt:
+            pass
+
+    def release(self, now):
+        released = release_due_posts(now)
+        if released:
+            self.stdout.write(f'Открыто публикаций: {released}.')
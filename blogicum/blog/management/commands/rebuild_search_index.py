@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from blog.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс публикаций'
+
+    def handle(self, *args, **options):
+        rebuild_search_index(connection)
+        self.stdout.write('Поисковый индекс перестроен.')
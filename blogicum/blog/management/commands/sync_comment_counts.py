@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Находит и исправляет расхождения в счётчиках комментариев постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Количество постов, проверяемых в одной транзакции.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только вывести число расхождений, ничего не меняя.',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        dry_run = options['dry_run']
+        actual = Comment.objects.filter(
+            post=OuterRef('pk'),
+        ).order_by().values('post').annotate(
+            total=Count('pk'),
+        ).values('total')
+
+        last_pk = 0
+        checked = fixed = 0
+        while True:
+            pks = list(
+                Post.objects.filter(
+                    pk__gt=last_pk,
+                ).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+            )
+            if not pks:
+                break
+            last_pk = pks[-1]
+            checked += len(pks)
+            with transaction.atomic():
+                drifted = list(
+                    Post.objects.filter(
+                        pk__in=pks,
+                    ).annotate(
+                        actual_count=Coalesce(Subquery(actual), 0),
+                    ).exclude(
+                        comment_count=F('actual_count'),
+                    ).values_list('pk', flat=True)
+                )
+                fixed += len(drifted)
+                if drifted and not dry_run:
+                    Post.objects.filter(pk__in=drifted).update(
+                        comment_count=Coalesce(Subquery(actual), 0)
+                    )
+
+        verb = 'Найдено' if dry_run else 'Исправлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено постов: {checked}. {verb} расхождений: {fixed}.'
+        ))
@@ -0,0 +1,59 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в реплики из настройки '
+        'DATABASE_REPLICAS'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=10,
+            help='Пауза в секундах между копированиями.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Скопировать один раз и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('Реплики не настроены: задайте DB_REPLICAS.')
+        if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite':
+            raise CommandError(
+                'Копирование файлом возможно только для SQLite.'
+            )
+        try:
+            while True:
+                self.sync()
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+    def sync(self):
+        """Согласованная копия через backup API без остановки записи"""
+        source = sqlite3.connect(settings.DATABASES[DEFAULT_DB_ALIAS]['NAME'])
+        try:
+            for alias in settings.DATABASE_REPLICAS:
+                start = time.perf_counter()
+                target = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(
+                    f'{alias}: {(time.perf_counter() - start) * 1000:.0f} мс'
+                )
+        finally:
+            source.close()
@@ -0,0 +1,389 @@
+import json
+import logging
+import mimetypes
+import os
+import random
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import (
+    HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+)
+from django.urls import URLResolver, get_resolver
+from django.utils.http import http_date
+
+from .holes import splice
+from .loader import batched_loading
+from .routers import replica_reads
+from .staticfiles import ENCODING_SUFFIXES
+
+logger = logging.getLogger('blog.query_budget')
+
+PRIMARY_COOKIE = 'primary_reads'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STATIC_CHUNK_SIZE = 64 * 1024
+STATIC_MAX_AGE = 60
+STATIC_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+budget_paused = ContextVar('budget_paused', default=False)
+
+
+class QueryBudgetExceeded(Exception):
+    """Представление выполнило больше SQL-запросов, чем заявлено"""
+
+
+class QueryCounter:
+    """Обёртка execute_wrapper, считающая запросы и время в БД"""
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        if budget_paused.get():
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.duration += time.perf_counter() - start
+
+
+@contextmanager
+def outside_query_budget():
+    """Запросы, число которых зависит от данных и в бюджет не входит"""
+    token = budget_paused.set(True)
+    try:
+        yield
+    finally:
+        budget_paused.reset(token)
+
+
+def collect_url_attribute(attribute, patterns=None, namespace=None):
+    """Значения атрибута модулей urls.py по полным именам представлений
+
+    Атрибут — словарь {имя: значение} или набор имён, которым
+    достаётся значение True. Возвращает словарь вида {'blog:index': 5}.
+    """
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    values = {}
+    for pattern in patterns:
+        if not isinstance(pattern, URLResolver):
+            continue
+        child_namespace = namespace
+        if pattern.namespace:
+            child_namespace = ':'.join(
+                filter(None, (namespace, pattern.namespace))
+            )
+        module_values = getattr(pattern.urlconf_module, attribute, {})
+        if not isinstance(module_values, dict):
+            module_values = dict.fromkeys(module_values, True)
+        for url_name, value in module_values.items():
+            values[':'.join(filter(None, (child_namespace, url_name)))] = (
+                value
+            )
+        values.update(
+            collect_url_attribute(
+                attribute, pattern.url_patterns, child_namespace
+            )
+        )
+    return values
+
+
+def collect_query_budgets():
+    """Бюджеты из атрибута query_budgets модулей urls.py"""
+    return collect_url_attribute('query_budgets')
+
+
+class QueryBudgetMiddleware:
+    """Контроль числа SQL-запросов на каждое именованное представление
+
+    Действие при превышении задаёт настройка QUERY_BUDGET_ACTION:
+    'raise' — исключение QueryBudgetExceeded, 'log' — предупреждение
+    в логгер blog.query_budget. Изменения данных к этому моменту уже
+    зафиксированы, поэтому для небезопасных методов превышение только
+    логируется.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.budgets = None
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return response
+        view_name = match.view_name
+        duration_ms = counter.duration * 1000
+        logger.debug(
+            '%s: %d queries, %.1f ms', view_name, counter.queries, duration_ms
+        )
+        if settings.DEBUG:
+            response['Server-Timing'] = (
+                f'db;dur={duration_ms:.1f};desc="{counter.queries} queries"'
+            )
+
+        if self.budgets is None:
+            self.budgets = collect_query_budgets()
+        budget = self.budgets.get(view_name)
+        if budget is None or counter.queries <= budget:
+            return response
+
+        message = (
+            f'{view_name} выполнило {counter.queries} SQL-запросов '
+            f'при бюджете {budget} ({duration_ms:.1f} мс)'
+        )
+        if (
+            getattr(settings, 'QUERY_BUDGET_ACTION', 'log') == 'raise'
+            and request.method in SAFE_METHODS
+        ):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Чтение с реплик для представлений из replica_views модулей urls.py
+
+    После запроса с изменением данных пользователь получает cookie на
+    DATABASE_REPLICA_STICKY_SECONDS секунд, и пока она жива, все его
+    чтения идут в основную базу: реплика могла ещё не получить запись.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.views = None
+
+    def __call__(self, request):
+        token = replica_reads.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_reads.reset(token)
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PRIMARY_COOKIE,
+                '1',
+                max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.views is None:
+            self.views = collect_url_attribute('replica_views')
+        if (
+            request.method in SAFE_METHODS
+            and PRIMARY_COOKIE not in request.COOKIES
+            and request.resolver_match.view_name in self.views
+        ):
+            replica_reads.set(random.choice(settings.DATABASE_REPLICAS))
+
+
+class IdentityMapMiddleware:
+    """Пакетная загрузка связанных объектов на время запроса"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with batched_loading():
+            return self.get_response(request)
+
+
+class EdgePersonalizationMiddleware:
+    """Подстановка фрагментов пользователя в общие страницы в режиме 'edge'
+
+    Обрабатываются только ответы, отмеченные anonymous_page_cache как
+    общие, остальные страницы, в том числе админка, не меняются. Режим
+    проверяется на каждом запросе. Стоит после CsrfViewMiddleware в
+    списке, чтобы выданный при подстановке CSRF-токен попал в cookie.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            settings.PAGE_PERSONALIZATION != 'edge'
+            or not getattr(response, 'shared_page', False)
+            or response.streaming
+        ):
+            return response
+        response.content = splice(response.content, request)
+        if response.has_header('Content-Length'):
+            response['Content-Length'] = str(len(response.content))
+        return response
+
+
+class StaticFile:
+    """Собранный статический файл с открытыми дескрипторами копий"""
+
+    def __init__(self, path, immutable):
+        stat = os.stat(path)
+        self.content_type = (
+            mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        )
+        self.last_modified = http_date(stat.st_mtime)
+        self.version = f'{stat.st_size:x}-{int(stat.st_mtime):x}'
+        self.immutable = immutable
+        self.variants = {None: self._open(path, stat)}
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            if os.path.isfile(path + suffix):
+                self.variants[encoding] = self._open(path + suffix)
+
+    @staticmethod
+    def _open(path, stat=None):
+        fd = os.open(path, os.O_RDONLY)
+        if stat is None:
+            stat = os.fstat(fd)
+        return fd, stat.st_size
+
+    def etag(self, encoding):
+        if encoding is None:
+            return f'"{self.version}"'
+        return f'"{self.version}-{encoding}"'
+
+    def choose_encoding(self, accept_encoding):
+        """Лучшая из имеющихся копий, которую принимает клиент"""
+        accepted = set()
+        for item in accept_encoding.split(','):
+            coding, _, params = item.strip().partition(';')
+            quality = params.strip().partition('=')[2]
+            try:
+                if quality and float(quality) <= 0:
+                    continue
+            except ValueError:
+                continue
+            accepted.add(coding.strip().lower())
+        for encoding in ENCODING_SUFFIXES:
+            if encoding in self.variants and (
+                encoding in accepted or '*' in accepted
+            ):
+                return encoding
+        return None
+
+    def read_chunks(self, encoding):
+        fd, size = self.variants[encoding]
+        offset = 0
+        while offset < size:
+            chunk = os.pread(fd, min(STATIC_CHUNK_SIZE, size - offset), offset)
+            if not chunk:
+                break
+            offset += len(chunk)
+            yield chunk
+
+
+class StaticFilesMiddleware:
+    """Раздача собранной статики из STATIC_ROOT без отдельного веб-сервера
+
+    Файлы с хэшем в имени из манифеста отдаются с Cache-Control immutable
+    на год, остальные — с коротким сроком. Сжатая копия (.br или .gz от
+    CompressedManifestStaticFilesStorage) выбирается по Accept-Encoding.
+    Файлы открываются один раз на процесс и читаются через pread, поэтому
+    дескрипторы безопасно делить между потоками. Новая статика появляется
+    только при выкладке, вместе с перезапуском процесса. При DEBUG
+    middleware отключается, и статику раздаёт django.contrib.staticfiles.
+    """
+
+    def __init__(self, get_response):
+        if (
+            settings.DEBUG
+            or not settings.STATIC_ROOT
+            or not settings.STATIC_URL
+        ):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.root = os.path.realpath(settings.STATIC_ROOT)
+        self.prefix = settings.STATIC_URL
+        if '://' in self.prefix:
+            raise MiddlewareNotUsed
+        self.files = {}
+        self.lock = threading.Lock()
+        self.hashed_names = None
+
+    def __call__(self, request):
+        if (
+            request.method not in ('GET', 'HEAD')
+            or not request.path_info.startswith(self.prefix)
+        ):
+            return self.get_response(request)
+        static_file = self.find(request.path_info[len(self.prefix):])
+        if static_file is None:
+            return self.get_response(request)
+        return self.serve(request, static_file)
+
+    def load_hashed_names(self):
+        try:
+            with open(os.path.join(self.root, 'staticfiles.json')) as manifest:
+                return frozenset(json.load(manifest).get('paths', {}).values())
+        except (OSError, ValueError):
+            return frozenset()
+
+    def find(self, name):
+        static_file = self.files.get(name)
+        if static_file is not None:
+            return static_file
+        path = os.path.realpath(os.path.join(self.root, name))
+        if (
+            not path.startswith(self.root + os.sep)
+            or path.endswith(tuple(ENCODING_SUFFIXES.values()))
+            or not os.path.isfile(path)
+        ):
+            return None
+        with self.lock:
+            if self.hashed_names is None:
+                self.hashed_names = self.load_hashed_names()
+            static_file = self.files.get(name)
+            if static_file is None:
+                static_file = StaticFile(path, name in self.hashed_names)
+                self.files[name] = static_file
+        return static_file
+
+    def serve(self, request, static_file):
+        vary = len(static_file.variants) > 1
+        encoding = static_file.choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        etag = static_file.etag(encoding)
+        if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+            response = HttpResponseNotModified()
+        else:
+            if request.method == 'HEAD':
+                response = HttpResponse(content_type=static_file.content_type)
+            else:
+                response = StreamingHttpResponse(
+                    static_file.read_chunks(encoding),
+                    content_type=static_file.content_type,
+                )
+            response['Content-Length'] = static_file.variants[encoding][1]
+            if encoding is not None:
+                response['Content-Encoding'] = encoding
+            response['Last-Modified'] = static_file.last_modified
+        response['ETag'] = etag
+        if static_file.immutable:
+            response['Cache-Control'] = (
+                f'public, max-age={STATIC_IMMUTABLE_MAX_AGE}, immutable'
+            )
+        else:
+            response['Cache-Control'] = f'public, max-age={STATIC_MAX_AGE}'
+        if vary:
+            response['Vary'] = 'Accept-Encoding'
+        return response
@@ -0,0 +1,99 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:03
+
+import blog.search
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Копия blog.search.SEARCH_TRIGGERS_SQL на момент миграции.
+SEARCH_TRIGGERS_SQL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_post_search_insert
+    AFTER INSERT ON blog_post BEGIN
+        INSERT INTO blog_post_search(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_post_search_delete
+    AFTER DELETE ON blog_post BEGIN
+        INSERT INTO blog_post_search(blog_post_search, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_post_search_update
+    AFTER UPDATE OF title, text ON blog_post
+    WHEN old.title IS NOT new.title OR old.text IS NOT new.text BEGIN
+        INSERT INTO blog_post_search(blog_post_search, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO blog_post_search(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+)
+
+CREATE_SEARCH_SQL = (
+    """
+    CREATE VIRTUAL TABLE blog_post_search USING fts5(
+        title,
+        text,
+        content='blog_post',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    *SEARCH_TRIGGERS_SQL,
+    # Совпадение в заголовке весит больше совпадения в тексте.
+    """
+    INSERT INTO blog_post_search(blog_post_search, rank)
+    VALUES ('rank', 'bm25(10.0, 1.0)')
+    """,
+    "INSERT INTO blog_post_search(blog_post_search) VALUES ('rebuild')",
+)
+
+DROP_SEARCH_SQL = (
+    'DROP TRIGGER IF EXISTS blog_post_search_insert',
+    'DROP TRIGGER IF EXISTS blog_post_search_delete',
+    'DROP TRIGGER IF EXISTS blog_post_search_update',
+    'DROP TABLE IF EXISTS blog_post_search',
+)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_SEARCH_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SEARCH_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearch',
+            fields=[
+                ('post', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search', serialize=False, to='blog.post')),
+                ('title', models.TextField()),
+                ('text', models.TextField()),
+                ('document', blog.search.SearchDocumentField(db_column='blog_post_search')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'blog_post_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:18
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# Копия blog.search.SEARCH_TRIGGERS_SQL на момент миграции.
+SEARCH_TRIGGERS_SQL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_post_search_insert
+    AFTER INSERT ON blog_post BEGIN
+        INSERT INTO blog_post_search(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_post_search_delete
+    AFTER DELETE ON blog_post BEGIN
+        INSERT INTO blog_post_search(blog_post_search, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_post_search_update
+    AFTER UPDATE OF title, text ON blog_post
+    WHEN old.title IS NOT new.title OR old.text IS NOT new.text BEGIN
+        INSERT INTO blog_post_search(blog_post_search, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO blog_post_search(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+)
+
+
+def restore_search_triggers(apps, schema_editor):
+    """Триггеры индекса, которые SQLite удаляет при пересоздании blog_post"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in SEARCH_TRIGGERS_SQL:
+        schema_editor.execute(statement)
+
+
+def release_past_posts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.using(schema_editor.connection.alias).filter(
+        pub_date__lte=timezone.now(),
+    ).update(is_released=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_search'),
+    ]
+
+    operations = [
+        # При откате blog_post тоже пересоздаётся.
+        migrations.RunPython(
+            migrations.RunPython.noop, restore_search_triggers,
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_published_pub_date_idx',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_released',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Дата публикации наступила'),
+        ),
+        migrations.RunPython(release_past_posts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True), ('is_released', True)), fields=['pub_date'], name='post_published_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_released', False)), fields=['pub_date'], name='post_scheduled_pub_date_idx'),
+        ),
+        migrations.RunPython(
+            restore_search_triggers, migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,109 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:21
+
+from math import ceil
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+BATCH_SIZE = 2000
+# Копия blog.reading.text_summary на момент миграции.
+EXCERPT_WORDS = 10
+EXCERPT_MAX_LENGTH = 256
+WORDS_PER_MINUTE = 200
+
+# Копия blog.search.SEARCH_TRIGGERS_SQL на момент миграции.
+SEARCH_TRIGGERS_SQL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_post_search_insert
+    AFTER INSERT ON blog_post BEGIN
+        INSERT INTO blog_post_search(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_post_search_delete
+    AFTER DELETE ON blog_post BEGIN
+        INSERT INTO blog_post_search(blog_post_search, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_post_search_update
+    AFTER UPDATE OF title, text ON blog_post
+    WHEN old.title IS NOT new.title OR old.text IS NOT new.text BEGIN
+        INSERT INTO blog_post_search(blog_post_search, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO blog_post_search(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+)
+
+
+def restore_search_triggers(apps, schema_editor):
+    """Триггеры индекса, которые SQLite удаляет при пересоздании blog_post"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in SEARCH_TRIGGERS_SQL:
+        schema_editor.execute(statement)
+
+
+def text_summary(text):
+    """Отрывок, число слов и время чтения поста"""
+    excerpt = Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+    excerpt = Truncator(excerpt).chars(EXCERPT_MAX_LENGTH)
+    word_count = len(text.split())
+    reading_time = max(ceil(word_count / WORDS_PER_MINUTE), 1)
+    return excerpt, word_count, reading_time
+
+
+def fill_summaries(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.using(schema_editor.connection.alias)
+    last_pk = 0
+    while True:
+        batch = list(
+            posts.filter(pk__gt=last_pk).order_by('pk').only('pk', 'text')[
+                :BATCH_SIZE
+            ]
+        )
+        if not batch:
+            break
+        for post in batch:
+            post.excerpt, post.word_count, post.reading_time = (
+                text_summary(post.text)
+            )
+        posts.bulk_update(batch, ['excerpt', 'word_count', 'reading_time'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_is_released'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            migrations.RunPython.noop, restore_search_triggers,
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=256, verbose_name='Анонс'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=1, editable=False, verbose_name='Время чтения, мин'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Количество слов'),
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+        migrations.RunPython(
+            restore_search_triggers, migrations.RunPython.noop,
+        ),
+    ]
@@ -1,9 +1,20 @@
+from contextvars import ContextVar
+
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from .images import image_variant
+from .reading import EXCERPT_MAX_LENGTH, text_summary
+from .rows import POST_ROW_FIELDS, PostRowIterable
+from .search import SEARCH_TABLE, SearchDocumentField, match_query
 
 
 User = get_user_model()
 
+# Посты, которые удаляются вместе с комментариями прямо сейчас.
+deleting_posts = ContextVar('deleting_posts', default=frozenset())
+
 
 class Location(models.Model):
     name = models.CharField(
@@ -68,6 +79,47 @@ class Category(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+
+    def published(self):
+        """Публикации, видимые всем посетителям
+
+        Наступление даты публикации отмечает флаг is_released, который
+        ставит обработчик publish_scheduled, поэтому запрос не зависит
+        от текущего времени.
+        """
+        return self.filter(
+            is_published=True,
+            is_released=True,
+            category__is_published=True,
+        )
+
+    def rows(self):
+        """Карточки ленты как PostRow из одного запроса values_list
+
+        Автор, категория и местоположение берутся соединениями в том же
+        запросе, полный текст поста не загружается.
+        """
+        clone = self.values_list(*POST_ROW_FIELDS)
+        clone._iterable_class = PostRowIterable
+        return clone
+
+    def search(self, text):
+        """Посты, подходящие под поисковую строку, от лучших к худшим"""
+        query = match_query(text)
+        if query is None:
+            return self.none()
+        return self.filter(search__document__match=query).order_by(
+            'search__rank', '-pub_date', '-pk'
+        )
+
+
+class PublishedPostManager(models.Manager.from_queryset(PostQuerySet)):
+
+    def get_queryset(self):
+        return super().get_queryset().published()
+
+
 class Post(models.Model):
     title = models.CharField(
         max_length=256,
@@ -114,19 +166,158 @@ class Post(models.Model):
         verbose_name='Добавлено',
         auto_now_add=True,
     )
+    # Не auto_now: loaddata сохраняет посты в обход save() и pre_save,
+    # и дампы без этого поля должны загружаться с датой загрузки.
+    updated_at = models.DateTimeField(
+        verbose_name='Изменено',
+        default=timezone.now,
+        editable=False,
+    )
     image = models.ImageField(
         'Фото',
         blank=True,
         upload_to='post_images',
     )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
+    image_variants = models.JSONField(
+        default=dict,
+        editable=False,
+        verbose_name='Варианты фото',
+    )
+    is_released = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Дата публикации наступила',
+    )
+    excerpt = models.CharField(
+        max_length=EXCERPT_MAX_LENGTH,
+        blank=True,
+        editable=False,
+        verbose_name='Анонс',
+    )
+    word_count = models.IntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество слов',
+    )
+    reading_time = models.PositiveSmallIntegerField(
+        default=1,
+        editable=False,
+        verbose_name='Время чтения, мин',
+    )
+
+    objects = PostQuerySet.as_manager()
+    published = PublishedPostManager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_published=True, is_released=True),
+                name='post_published_pub_date_idx',
+            ),
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_released=False),
+                name='post_scheduled_pub_date_idx',
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                name='post_category_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_image = instance.__dict__.get('image')
+        return instance
+
+    def update_summary(self):
+        """Пересчёт анонса, числа слов и времени чтения по тексту"""
+        self.excerpt, self.word_count, self.reading_time = text_summary(
+            self.text
+        )
+
+    @property
+    def card_image(self):
+        return image_variant(self, 'card')
+
+    @property
+    def detail_image(self):
+        return image_variant(self, 'detail')
+
+    def save(self, force_insert=False, force_update=False, using=None,
+             update_fields=None):
+        """Сохранение без перезаписи полей, которые ведутся отдельно
+
+        Счётчик комментариев меняется только атомарными UPDATE из сигналов
+        комментариев, а варианты фото — обработчиком build_image_variants,
+        поэтому при обновлении поста значения из загруженного ранее
+        экземпляра не записываются. При замене фото варианты сбрасываются
+        и снова попадают в очередь обработчика. Пост с наступившей датой
+        публикации виден сразу, с будущей — ждёт publish_scheduled.
+        Анонс пересчитывается, если текст загружен.
+        """
+        now = timezone.now()
+        self.updated_at = now
+        self.is_released = self.pub_date <= now
+        if update_fields is not None and 'pub_date' in update_fields:
+            update_fields = {*update_fields, 'is_released'}
+        if 'text' in self.__dict__:
+            self.update_summary()
+            if update_fields is not None and 'text' in update_fields:
+                update_fields = {
+                    *update_fields, 'excerpt', 'word_count', 'reading_time'
+                }
+        if (
+            not self._state.adding
+            and self.pk is not None
+            and not force_insert
+            and update_fields is None
+        ):
+            skipped = {'comment_count', 'image_variants'}
+            loaded_image = getattr(self, '_loaded_image', None)
+            if loaded_image is not None and self.image.name != loaded_image:
+                self.image_variants = {}
+                skipped.discard('image_variants')
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in skipped
+            ]
+        super().save(
+            force_insert=force_insert,
+            force_update=force_update,
+            using=using,
+            update_fields=update_fields,
+        )
+        self._loaded_image = self.image.name
+
+    def delete(self, using=None, keep_parents=False):
+        """Удаление поста вместе с комментариями
+
+        Пока идёт каскад, сигналы комментариев не пересчитывают счётчик
+        удаляемого поста.
+        """
+        token = deleting_posts.set(deleting_posts.get() | {self.pk})
+        try:
+            return super().delete(using=using, keep_parents=keep_parents)
+        finally:
+            deleting_posts.reset(token)
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -149,3 +340,99 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_idx',
+            ),
+        )
+
+
+class OutboxMessage(models.Model):
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Ожидает отправки'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    )
+
+    subject = models.CharField(
+        max_length=256,
+        verbose_name='Тема',
+    )
+    body = models.TextField(
+        verbose_name='Текст письма',
+    )
+    from_email = models.EmailField(
+        verbose_name='Отправитель',
+    )
+    recipients = models.JSONField(
+        default=list,
+        verbose_name='Получатели',
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        verbose_name='Статус',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток отправки',
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующая попытка',
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка',
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено',
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Отправлено',
+    )
+
+    class Meta:
+        verbose_name = 'исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = (
+            models.Index(
+                fields=('next_attempt_at',),
+                condition=models.Q(status='pending'),
+                name='outbox_pending_idx',
+            ),
+        )
+
+    def __str__(self):
+        return self.subject
+
+
+class PostSearch(models.Model):
+    """Строка полнотекстового индекса FTS5 по заголовку и тексту поста
+
+    Таблица создаётся миграцией и заполняется триггерами на blog_post.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        primary_key=True,
+        db_column='rowid',
+        on_delete=models.DO_NOTHING,
+        related_name='search',
+    )
+    title = models.TextField()
+    text = models.TextField()
+    document = SearchDocumentField(db_column=SEARCH_TABLE)
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = SEARCH_TABLE
@@ -0,0 +1,252 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.conf import settings
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .cache import (
+    CATALOG_TAG, can_store_versioned, get_page_cache, get_tag_versions
+)
+
+POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 50
+MAX_NUMBERED_PAGES = 5
+
+
+def encode_cursor(obj, field='pub_date'):
+    """Непрозрачный курсор по ключу (field, id)"""
+    raw = f'{getattr(obj, field).isoformat()}|{obj.pk}'.encode()
+    return urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Разбор курсора; для некорректного значения возвращает None"""
+    try:
+        raw = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        value, pk = raw.split('|')
+        value = parse_datetime(value)
+        pk = int(pk)
+    except (BinasciiError, UnicodeDecodeError, ValueError):
+        return None
+    if value is None:
+        return None
+    return value, pk
+
+
+class FeedPage(Page):
+    """Страница с номером, которая умеет ссылаться на курсорный режим"""
+
+    is_keyset = False
+
+    @property
+    def next_query(self):
+        if not self.has_next():
+            return ''
+        next_number = self.next_page_number()
+        if next_number <= self.paginator.max_numbered_pages:
+            return f'{self.paginator.base_query}page={next_number}'
+        return f'after={encode_cursor(self.object_list[-1])}'
+
+    @property
+    def previous_query(self):
+        if not self.has_previous():
+            return ''
+        return (
+            f'{self.paginator.base_query}page={self.previous_page_number()}'
+        )
+
+    @property
+    def show_last(self):
+        return self.paginator.num_pages <= self.paginator.max_numbered_pages
+
+
+class FeedPaginator(Paginator):
+    """Нумерованная разбивка только для первых страниц ленты
+
+    Если задан count_key, общее число публикаций берётся из кэша. Запись
+    версионируется тегами count_tags, которые меняются и при открытии
+    отложенной публикации, поэтому COUNT(*) выполняется только после
+    изменения ленты. Параметры base_query, например 'q=...&',
+    добавляются в начало ссылок на соседние страницы.
+    """
+
+    def __init__(self, object_list, per_page=POSTS_PER_PAGE,
+                 max_numbered_pages=MAX_NUMBERED_PAGES, count_key=None,
+                 count_tags=(), base_query='', **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.max_numbered_pages = max_numbered_pages
+        self.count_key = count_key
+        self.count_tags = count_tags
+        self.base_query = base_query
+
+    @cached_property
+    def count(self):
+        if self.count_key is None:
+            return super().count
+        versions = get_tag_versions([*self.count_tags, CATALOG_TAG])
+        key = 'feed_count:{}:{}'.format(
+            self.count_key, '.'.join(str(version) for version in versions)
+        )
+        cache = get_page_cache()
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            if can_store_versioned():
+                cache.set(key, count, timeout=settings.PAGE_CACHE_TIMEOUT)
+        return count
+
+    @property
+    def page_range(self):
+        return range(1, min(self.num_pages, self.max_numbered_pages) + 1)
+
+    def get_page(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            number = 1
+        return super().get_page(min(number, self.max_numbered_pages))
+
+    def _get_page(self, *args, **kwargs):
+        page = FeedPage(*args, **kwargs)
+        page.object_list = list(page.object_list)
+        return page
+
+
+class KeysetPage:
+    """Страница курсорной разбивки"""
+
+    is_keyset = True
+    show_last = False
+    number = None
+
+    def __init__(self, object_list, has_next, has_previous, field):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self._field = field
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_query(self):
+        if not self._has_next:
+            return ''
+        return f'after={encode_cursor(self.object_list[-1], self._field)}'
+
+    @property
+    def previous_query(self):
+        if not self._has_previous:
+            return ''
+        return f'before={encode_cursor(self.object_list[0], self._field)}'
+
+
+class KeysetPaginator:
+    """Курсорная разбивка по ключу (field, id)
+
+    По умолчанию — публикации по pub_date от новых к старым. Запрос
+    страницы — это диапазонное сканирование с LIMIT без OFFSET и без
+    COUNT(*), поэтому его стоимость не зависит от глубины.
+    """
+
+    def __init__(self, queryset, per_page=POSTS_PER_PAGE, field='pub_date',
+                 descending=True):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.field = field
+        self.descending = descending
+
+    def get_page(self, after=None, before=None):
+        if before:
+            key = decode_cursor(before)
+            if key is not None:
+                return self._page_before(*key)
+        key = decode_cursor(after) if after else None
+        if key is None:
+            return self._page_after(None, None)
+        return self._page_after(*key)
+
+    def _ordering(self, descending):
+        prefix = '-' if descending else ''
+        return f'{prefix}{self.field}', f'{prefix}pk'
+
+    def _beyond(self, value, pk, descending):
+        lookup = 'lt' if descending else 'gt'
+        return (
+            Q(**{f'{self.field}__{lookup}': value})
+            | Q(**{self.field: value, f'pk__{lookup}': pk})
+        )
+
+    def _page_after(self, value, pk):
+        queryset = self.queryset
+        if value is not None:
+            queryset = queryset.filter(
+                self._beyond(value, pk, self.descending)
+            )
+        items = list(
+            queryset.order_by(
+                *self._ordering(self.descending)
+            )[:self.per_page + 1]
+        )
+        return KeysetPage(
+            items[:self.per_page],
+            has_next=len(items) > self.per_page,
+            has_previous=value is not None,
+            field=self.field,
+        )
+
+    def _page_before(self, value, pk):
+        items = list(
+            self.queryset.filter(
+                self._beyond(value, pk, not self.descending)
+            ).order_by(
+                *self._ordering(not self.descending)
+            )[:self.per_page + 1]
+        )
+        if len(items) <= self.per_page:
+            return self._page_after(None, None)
+        items = items[:self.per_page]
+        items.reverse()
+        return KeysetPage(
+            items, has_next=True, has_previous=True, field=self.field
+        )
+
+
+def paginate_posts(request, posts, per_page=POSTS_PER_PAGE, count_key=None,
+                   count_tags=()):
+    """Страница ленты: курсорная по ?after=/?before=, иначе по номеру"""
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    if after or before:
+        return KeysetPaginator(posts, per_page).get_page(
+            after=after,
+            before=before,
+        )
+    paginator = FeedPaginator(
+        posts.order_by('-pub_date', '-pk'),
+        per_page,
+        count_key=count_key,
+        count_tags=count_tags,
+    )
+    return paginator.get_page(request.GET.get('page'))
@@ -0,0 +1,74 @@
+import heapq
+
+from django.utils import timezone
+
+from .cache import bump_tags, post_tags
+from .models import Post
+
+RELEASE_BATCH_SIZE = 500
+
+
+def release_due_posts(now=None):
+    """Открытие постов с наступившей датой публикации
+
+    Флаг ставится одним UPDATE на пачку, а страницы с открытыми постами
+    инвалидируются по их тегам. Возвращает число открытых постов.
+    """
+    now = now or timezone.now()
+    released = 0
+    while True:
+        due = list(
+            Post.objects.filter(
+                is_released=False,
+                pub_date__lte=now,
+            ).values_list(
+                'pk', 'category__slug', 'author__username',
+            )[:RELEASE_BATCH_SIZE]
+        )
+        if not due:
+            return released
+        Post.objects.filter(
+            pk__in=[pk for pk, _, _ in due],
+            is_released=False,
+            pub_date__lte=now,
+        ).update(is_released=True)
+        bump_tags({
+            tag
+            for pk, category_slug, username in due
+            for tag in post_tags(category_slug, username, post_id=pk)
+        })
+        released += len(due)
+
+
+class PublicationSchedule:
+    """Куча таймеров отложенных публикаций, упорядоченная по pub_date
+
+    В куче держатся только публикации ближайших horizon; вызов load
+    перечитывает их из базы, подхватывая новые и перенесённые посты.
+    Устаревшие таймеры безвредны: открытие проверяет дату по базе.
+    """
+
+    def __init__(self, horizon):
+        self.horizon = horizon
+        self.heap = []
+
+    def load(self, now):
+        self.heap = list(
+            Post.objects.filter(
+                is_released=False,
+                pub_date__gt=now,
+                pub_date__lte=now + self.horizon,
+            ).values_list('pub_date', 'pk')
+        )
+        heapq.heapify(self.heap)
+
+    def pop_due(self, now):
+        """Снятие сработавших таймеров; True, если такие были"""
+        due = False
+        while self.heap and self.heap[0][0] <= now:
+            heapq.heappop(self.heap)
+            due = True
+        return due
+
+    def next_timer(self):
+        return self.heap[0][0] if self.heap else None
@@ -0,0 +1,21 @@
+from math import ceil
+
+from django.utils.text import Truncator
+
+# Столько слов текста выводится в карточке ленты.
+EXCERPT_WORDS = 10
+EXCERPT_MAX_LENGTH = 256
+WORDS_PER_MINUTE = 200
+
+
+def text_summary(text):
+    """Анонс, число слов и время чтения в минутах для текста поста
+
+    Анонс совпадает с выводом фильтра truncatewords, которым карточка
+    ленты раньше обрезала полный текст при каждом рендере.
+    """
+    excerpt = Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+    excerpt = Truncator(excerpt).chars(EXCERPT_MAX_LENGTH)
+    word_count = len(text.split())
+    reading_time = max(ceil(word_count / WORDS_PER_MINUTE), 1)
+    return excerpt, word_count, reading_time
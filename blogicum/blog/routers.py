@@ -0,0 +1,43 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Реплика, которую ReplicaRoutingMiddleware выбрала на время
+# представления только для чтения. Все запросы одного представления идут
+# в одну реплику, чтобы не смешивать копии разной свежести.
+replica_reads = ContextVar('replica_reads', default=None)
+
+# Сессии и пользователи всегда читаются с основной базы: на отстающей
+# реплике может остаться сессия, из которой пользователь уже вышел, или
+# старые права и пароль.
+PRIMARY_ONLY_APPS = {'sessions', 'auth'}
+
+
+class ReplicaRouter:
+    """Чтение с реплики из replica_reads, запись — в основную базу
+
+    Реплики перечислены в настройке DATABASE_REPLICAS и содержат копию
+    основной базы, поэтому связи между объектами из любых баз разрешены,
+    а миграции применяются только к основной.
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = replica_reads.get()
+        if replica is None or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,125 @@
+from django.core.files.storage import default_storage
+from django.db.models.query import BaseIterable, ValuesListIterable
+
+from .images import image_variant
+
+# Столбцы карточки ленты в порядке полей PostRow и вложенных строк.
+POST_ROW_FIELDS = (
+    'pk',
+    'title',
+    'excerpt',
+    'pub_date',
+    'is_published',
+    'image',
+    'image_variants',
+    'comment_count',
+    'reading_time',
+    'author__username',
+    'category__slug',
+    'category__title',
+    'category__is_published',
+    'location__name',
+    'location__is_published',
+)
+
+
+class Row:
+    """Компактная строка только для чтения, заполняемая по __slots__"""
+
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {getattr(self, "pk", "")}>'
+
+
+class AuthorRow(Row):
+    __slots__ = ('username',)
+
+
+class CategoryRow(Row):
+    __slots__ = ('slug', 'title', 'is_published')
+
+
+class LocationRow(Row):
+    __slots__ = ('name', 'is_published')
+
+
+class ImageRow(Row):
+    """Имя файла фото с тем же интерфейсом, что у ImageFieldFile"""
+
+    __slots__ = ('name',)
+
+    def __bool__(self):
+        return bool(self.name)
+
+    def __str__(self):
+        return self.name or ''
+
+    @property
+    def url(self):
+        return default_storage.url(self.name)
+
+
+class PostRow(Row):
+    """Публикация для карточки ленты вместо экземпляра Post"""
+
+    __slots__ = (
+        'pk',
+        'title',
+        'excerpt',
+        'pub_date',
+        'is_published',
+        'image',
+        'image_variants',
+        'comment_count',
+        'reading_time',
+        'author',
+        'category',
+        'location',
+    )
+
+    @property
+    def id(self):
+        return self.pk
+
+    @property
+    def card_image(self):
+        return image_variant(self, 'card')
+
+
+class PostRowIterable(BaseIterable):
+    """Строки PostRow из кортежей values_list(*POST_ROW_FIELDS)"""
+
+    def __iter__(self):
+        values_list = ValuesListIterable(
+            self.queryset, self.chunked_fetch, self.chunk_size
+        )
+        for values in values_list:
+            (
+                pk, title, excerpt, pub_date, is_published, image,
+                image_variants, comment_count, reading_time, username,
+                category_slug, category_title, category_is_published,
+                location_name, location_is_published,
+            ) = values
+            yield PostRow(
+                pk,
+                title,
+                excerpt,
+                pub_date,
+                is_published,
+                ImageRow(image),
+                image_variants,
+                comment_count,
+                reading_time,
+                AuthorRow(username),
+                None if category_slug is None else CategoryRow(
+                    category_slug, category_title, category_is_published
+                ),
+                None if location_name is None else LocationRow(
+                    location_name, location_is_published
+                ),
+            )
@@ -0,0 +1,86 @@
+import re
+
+from django.db import models
+
+SEARCH_TABLE = 'blog_post_search'
+MAX_QUERY_TERMS = 10
+MAX_SEARCH_PAGES = 20
+
+TERM_RE = re.compile(r'\w+')
+
+# Синхронизация внешнего индекса FTS5 с таблицей blog_post.
+SEARCH_TRIGGERS_SQL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_post_search_insert
+    AFTER INSERT ON blog_post BEGIN
+        INSERT INTO blog_post_search(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_post_search_delete
+    AFTER DELETE ON blog_post BEGIN
+        INSERT INTO blog_post_search(blog_post_search, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_post_search_update
+    AFTER UPDATE OF title, text ON blog_post
+    WHEN old.title IS NOT new.title OR old.text IS NOT new.text BEGIN
+        INSERT INTO blog_post_search(blog_post_search, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO blog_post_search(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+)
+
+
+class SearchDocumentField(models.TextField):
+    """Скрытый столбец FTS5-таблицы с именем самой таблицы для MATCH"""
+
+
+@SearchDocumentField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+def match_query(text):
+    """Запрос FTS5 из пользовательской строки или None
+
+    Операторы FTS5 не пропускаются: каждое слово берётся в кавычки
+    и ищется по префиксу, все слова должны встретиться в посте.
+    """
+    terms = TERM_RE.findall(text.lower())[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def rebuild_search_index(connection):
+    """Полная перестройка индекса по содержимому blog_post"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"
+        )
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')"
+        )
+
+
+def restore_search_triggers(apps, schema_editor):
+    """Операция RunPython, возвращающая триггеры индекса
+
+    SQLite удаляет триггеры вместе с таблицей, а миграции, меняющие
+    поля Post, пересоздают blog_post целиком.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in SEARCH_TRIGGERS_SQL:
+        schema_editor.execute(statement)
@@ -0,0 +1,118 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import CATALOG_TAG, bump_tags, stored_post_tags
+from .models import Category, Comment, Location, Post, deleting_posts
+from .reading import text_summary
+
+User = get_user_model()
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post(sender, instance, **kwargs):
+    """Запоминание страниц удаляемого поста, пока он есть в базе"""
+    instance._page_cache_tags = stored_post_tags(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post_pages(sender, instance, **kwargs):
+    bump_tags(getattr(instance, '_page_cache_tags', []))
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_pages(sender, instance, raw=False, **kwargs):
+    """Запоминание страниц, с которых пост может исчезнуть при правке"""
+    if raw or instance.pk is None:
+        instance._page_cache_tags = []
+    else:
+        instance._page_cache_tags = stored_post_tags(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def invalidate_post_pages(sender, instance, raw=False, **kwargs):
+    """Инвалидация закэшированных страниц с публикацией"""
+    if raw:
+        return
+    bump_tags([
+        *getattr(instance, '_page_cache_tags', []),
+        *stored_post_tags(instance.pk),
+    ])
+
+
+@receiver(post_save, sender=Post)
+def complete_loaded_post(sender, instance, raw=False, using=None, **kwargs):
+    """Вычисляемые поля поста, загруженного loaddata
+
+    Фикстуры сохраняются в обход save(), а в старых дампах полей
+    is_released и анонса нет: без пересчёта такие посты не выходили бы,
+    а карточки оставались без текста.
+    """
+    if not raw:
+        return
+    excerpt, word_count, reading_time = text_summary(instance.text)
+    sender._base_manager.using(using).filter(pk=instance.pk).update(
+        is_released=instance.pub_date <= timezone.now(),
+        excerpt=excerpt,
+        word_count=word_count,
+        reading_time=reading_time,
+    )
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    """Увеличение счётчика комментариев поста
+
+    Правка комментария тоже считается изменением поста: у комментариев
+    нет своей даты изменения, и страница поста опирается на updated_at.
+    """
+    if raw:
+        return
+    changes = {'updated_at': timezone.now()}
+    if created:
+        changes['comment_count'] = F('comment_count') + 1
+    Post.objects.filter(pk=instance.post_id).update(**changes)
+    bump_tags(stored_post_tags(instance.post_id))
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    """Уменьшение счётчика комментариев поста"""
+    if instance.post_id in deleting_posts.get():
+        return
+    Post.objects.filter(
+        pk=instance.post_id,
+        comment_count__gt=0,
+    ).update(
+        comment_count=F('comment_count') - 1,
+        updated_at=timezone.now(),
+    )
+    bump_tags(stored_post_tags(instance.post_id))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_catalog_pages(sender, raw=False, **kwargs):
+    """Инвалидация всех страниц с публикациями при правке справочников"""
+    if not raw:
+        bump_tags([CATALOG_TAG])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_pages(sender, raw=False, created=False,
+                          update_fields=None, **kwargs):
+    """Инвалидация страниц при правке пользователя
+
+    Новый пользователь и обновление одной лишь даты входа на страницах
+    с публикациями не отражаются.
+    """
+    if raw or created or update_fields == frozenset(('last_login',)):
+        return
+    bump_tags([CATALOG_TAG])
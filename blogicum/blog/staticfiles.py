@@ -0,0 +1,60 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Сжимаются только текстовые форматы: картинки уже сжаты своими кодеками.
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.txt', '.html', '.json', '.xml', '.ico',
+)
+MIN_COMPRESS_SIZE = 256
+ENCODING_SUFFIXES = {
+    'br': '.br',
+    'gzip': '.gz',
+}
+
+
+def _gzip(content):
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def _brotli(content):
+    return brotli.compress(content, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хэшированные имена файлов и сжатые копии рядом с ними
+
+    При collectstatic для каждого текстового файла, как с хэшем в имени,
+    так и без него, создаются соседние .gz и, если установлен пакет
+    brotli, .br. Копия сохраняется, только если она меньше исходника.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in dict.fromkeys([*paths, *self.hashed_files.values()]):
+            self.compress(name)
+
+    def compress(self, name):
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            content = source.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+        compressors = {'gzip': _gzip}
+        if brotli is not None:
+            compressors['br'] = _brotli
+        for encoding, compressor in compressors.items():
+            compressed = compressor(content)
+            if len(compressed) >= len(content):
+                continue
+            with open(path + ENCODING_SUFFIXES[encoding], 'wb') as target:
+                target.write(compressed)
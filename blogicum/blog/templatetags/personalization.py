@@ -0,0 +1,63 @@
+from django import template
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from blog.holes import (
+    HOLES, hole_markup, region_markup, region_visible
+)
+
+register = template.Library()
+
+
+def _shared(context):
+    return getattr(context.request, 'shared_page', False)
+
+
+class OnlyNode(template.Node):
+    def __init__(self, nodelist, audience, argument):
+        self.nodelist = nodelist
+        self.audience = audience
+        self.argument = argument
+
+    def render(self, context):
+        audience = self.audience.resolve(context)
+        argument = (
+            '' if self.argument is None else self.argument.resolve(context)
+        )
+        if _shared(context):
+            return region_markup(
+                audience, argument, mark_safe(self.nodelist.render(context))
+            )
+        if region_visible(context['user'], audience, escape(argument)):
+            return self.nodelist.render(context)
+        return ''
+
+
+@register.tag
+def only(parser, token):
+    """Участок страницы для части посетителей
+
+    {% only 'user' %}, {% only 'guest' %} или {% only 'owner' имя %},
+    закрывается {% endonly %}. На общей странице выводит разметку
+    blog.holes, иначе сразу решает, виден ли участок.
+    """
+    bits = token.split_contents()
+    if len(bits) not in (2, 3):
+        raise template.TemplateSyntaxError(
+            f'{bits[0]} принимает аудиторию и, для owner, имя автора'
+        )
+    nodelist = parser.parse(('endonly',))
+    parser.delete_first_token()
+    return OnlyNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2]) if len(bits) == 3 else None,
+    )
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, name):
+    """Данные пользователя: username, profile_url или csrf_token"""
+    if _shared(context):
+        return hole_markup(name)
+    return mark_safe(HOLES[name](context.request))
@@ -0,0 +1,46 @@
+from django import template
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from blog.cache import (
+    CATALOG_TAG, can_store_versioned, get_page_cache, get_tag_versions
+)
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(posts):
+    """Карточки публикаций из кэша фрагментов
+
+    Версия карточки складывается из версии тега поста, тега справочников
+    и числа комментариев. Все карточки страницы читаются из кэша одним
+    get_many, недостающие рендерятся и записываются одним set_many.
+    """
+    posts = list(posts)
+    if not posts:
+        return []
+    cache = get_page_cache()
+    *post_versions, catalog_version = get_tag_versions(
+        [f'post:{post.pk}' for post in posts] + [CATALOG_TAG]
+    )
+    keys = [
+        f'post_card:{post.pk}:{version}:{catalog_version}:'
+        f'{post.comment_count}'
+        for post, version in zip(posts, post_versions)
+    ]
+    cached = cache.get_many(keys)
+    missing = {}
+    cards = []
+    for key, post in zip(keys, posts):
+        card = cached.get(key)
+        if card is None:
+            card = render_to_string(
+                'includes/post_card.html', {'post': post}
+            )
+            missing[key] = card
+        cards.append(mark_safe(card))
+    if missing and can_store_versioned():
+        cache.set_many(missing, timeout=settings.PAGE_CACHE_TIMEOUT)
+    return cards
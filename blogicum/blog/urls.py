@@ -4,17 +4,57 @@ from . import views
 
 app_name = 'blog'
 
+# Допустимое число SQL-запросов на один запрос к представлению,
+# включая загрузку сессии и пользователя.
+query_budgets = {
+    'index': 5,
+    'search': 5,
+    'post_detail': 5,
+    'post_comments': 5,
+    'category_posts': 6,
+    'profile': 6,
+    'session_state': 3,
+    'edit_profile': 5,
+    'add_comment': 8,
+    'edit_comment': 7,
+    'delete_comment': 9,
+    'create_post': 10,
+    'edit_post': 11,
+    'delete_post': 5,
+    'export_jsonl': 4,
+}
+
+# Представления только для чтения, которые можно обслуживать с реплик.
+replica_views = (
+    'index',
+    'search',
+    'post_detail',
+    'post_comments',
+    'category_posts',
+    'profile',
+)
+
 urlpatterns = [
     path(
         '',
         views.index,
         name='index'
     ),
+    path(
+        'search/',
+        views.search,
+        name='search',
+    ),
     path(
         'posts/<int:post_id>/',
         views.post_detail,
         name='post_detail'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path(
         'category/<slug:category_slug>/',
         views.category_posts,
@@ -25,6 +65,11 @@ urlpatterns = [
         views.profile,
         name='profile',
     ),
+    path(
+        'session/',
+        views.session_state,
+        name='session_state',
+    ),
     path(
         'edit/',
         views.edit_profile,
@@ -60,4 +105,9 @@ urlpatterns = [
         views.delete_post,
         name='delete_post',
     ),
+    path(
+        'export/',
+        views.export_jsonl,
+        name='export_jsonl',
+    ),
 ]
@@ -1,57 +1,101 @@
+from hashlib import md5
+from urllib.parse import urlencode
+
 from django.shortcuts import render, get_object_or_404, redirect
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
-from django.core.paginator import Paginator
-from django.db.models import Count
-
-from datetime import date
-
-from .models import Category, Post, Comment
+from django.db import transaction
+from django.http import (
+    HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+)
+from django.middleware.csrf import get_token
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.cache import never_cache
+
+from .bulk_io import (
+    EXPORT_MODELS, iter_blocks, iter_export, parse_checkpoint
+)
+from .cache import (
+    anonymous_page_cache, conditional_page, latest_publication,
+    post_updated_at
+)
+from .models import Category, Post, Comment, OutboxMessage
 from .forms import UserForm, CommentForm, PostForm
+from .middleware import outside_query_budget
+from .paginators import (
+    COMMENTS_PER_PAGE, POSTS_PER_PAGE, FeedPaginator, KeysetPaginator,
+    paginate_posts
+)
+from .search import MAX_SEARCH_PAGES
 
 
 User = get_user_model()
 
 
+@conditional_page('index', last_modified=latest_publication)
+@anonymous_page_cache('index')
 def index(request):
     """Главная страница проекта"""
-    posts = Post.objects.filter(
-        pub_date__lte=date.today(),
-        is_published__exact=True,
-        category__is_published__exact=True,
-    ).order_by(
-        '-pub_date'
-    ).annotate(
-        comment_count=Count('comment')
+    posts = Post.published.rows().order_by('-pub_date')
+
+    page_obj = paginate_posts(
+        request,
+        posts,
+        count_key='index',
+        count_tags=('index',),
     )
 
-    paginator = Paginator(posts, 10)
+    context = {
+        'page_obj': page_obj,
+    }
+
+    return render(
+        request,
+        'blog/index.html',
+        context,
+    )
 
-    page_number = request.GET.get('page')
 
-    page_obj = paginator.get_page(page_number)
+@conditional_page('index', last_modified=latest_publication)
+@anonymous_page_cache('index')
+def search(request):
+    """Полнотекстовый поиск по опубликованным постам"""
+    query = request.GET.get('q', '').strip()
+    posts = Post.published.search(query).rows()
+    # Дальние страницы поиска никому не нужны, а ограничение позволяет
+    # обойтись нумерованной разбивкой без курсоров.
+    paginator = FeedPaginator(
+        posts[:MAX_SEARCH_PAGES * POSTS_PER_PAGE],
+        max_numbered_pages=MAX_SEARCH_PAGES,
+        count_key='search:' + md5(query.encode()).hexdigest(),
+        count_tags=('index',),
+        base_query=urlencode({'q': query}) + '&',
+    )
 
     context = {
-        'page_obj': page_obj,
+        'query': query,
+        'page_obj': paginator.get_page(request.GET.get('page')),
     }
 
     return render(
         request,
-        'blog/index.html',
+        'blog/search.html',
         context,
     )
 
 
+@conditional_page(
+    'category:{category_slug}',
+    last_modified=latest_publication,
+)
+@anonymous_page_cache('category:{category_slug}')
 def category_posts(request, category_slug):
     """Страница отдельной категории"""
-    posts = Post.objects.filter(
+    posts = Post.published.rows().filter(
         category__slug__exact=category_slug,
-        is_published__exact=True,
-        pub_date__lte=date.today(),
     ).order_by(
         '-pub_date'
-    ).annotate(
-        comment_count=Count('comment')
     )
 
     category = get_object_or_404(
@@ -66,11 +110,12 @@ def category_posts(request, category_slug):
             'pages/403csrf.html',
         )
 
-    paginator = Paginator(posts, 10)
-
-    page_number = request.GET.get('page')
-
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate_posts(
+        request,
+        posts,
+        count_key=f'category:{category_slug}',
+        count_tags=(f'category:{category_slug}',),
+    )
 
     context = {
         'page_obj': page_obj,
@@ -84,10 +129,16 @@ def category_posts(request, category_slug):
     )
 
 
+@conditional_page('post:{post_id}', last_modified=post_updated_at)
+@anonymous_page_cache('post:{post_id}')
 def post_detail(request, post_id):
     """Страница отдельной публикации"""
     post = get_object_or_404(
-        Post,
+        Post.objects.select_related(
+            'author',
+            'category',
+            'location',
+        ),
         pk=post_id,
     )
 
@@ -98,9 +149,7 @@ def post_detail(request, post_id):
             status=404,
         )
 
-    comments = Comment.objects.filter(
-        post__exact=post_id,
-    ).order_by('created_at')
+    comments = paginate_comments(post_id)
 
     form = CommentForm()
 
@@ -110,13 +159,65 @@ def post_detail(request, post_id):
         'form': form,
     }
 
-    return render(
+    response = render(
         request,
         'blog/detail.html',
         context,
     )
+    if not post.is_published:
+        # Снятый с публикации пост видит только автор.
+        patch_cache_control(response, private=True)
+    return response
+
+
+def paginate_comments(post_id, after=None):
+    """Очередная порция комментариев поста по курсору (created_at, id)"""
+    return KeysetPaginator(
+        Comment.objects.select_related(
+            'author',
+        ).filter(
+            post__exact=post_id,
+        ),
+        COMMENTS_PER_PAGE,
+        field='created_at',
+        descending=False,
+    ).get_page(after=after)
+
+
+@anonymous_page_cache('post:{post_id}')
+def post_comments(request, post_id):
+    """Фрагмент со следующей порцией комментариев"""
+    post = get_object_or_404(
+        Post.objects.only('id', 'author_id', 'is_published'),
+        pk=post_id,
+    )
+
+    if request.user.pk != post.author_id and post.is_published is False:
+        return render(
+            request,
+            'pages/404.html',
+            status=404,
+        )
+
+    context = {
+        'post': post,
+        'comments': paginate_comments(post_id, request.GET.get('after')),
+    }
+
+    return render(
+        request,
+        'includes/comment_list.html',
+        context,
+    )
 
 
+def is_foreign_profile(request, username):
+    """Чужой профиль одинаков для всех, свой содержит черновики"""
+    return request.user.username != username
+
+
+@conditional_page('profile:{username}', last_modified=latest_publication)
+@anonymous_page_cache('profile:{username}', shared=is_foreign_profile)
 def profile(request, username):
     """Страница профиля пользователя"""
     user = get_object_or_404(
@@ -125,25 +226,22 @@ def profile(request, username):
     )
 
     if request.user == user:
-        posts = Post.objects.filter(
+        audience = 'own'
+        posts = Post.objects.rows().filter(
             author_id__exact=user.pk,
-        ).order_by('-pub_date').annotate(
-            comment_count=Count('comment')
-        )
+        ).order_by('-pub_date')
     else:
-        posts = Post.objects.filter(
+        audience = 'public'
+        posts = Post.published.rows().filter(
             author_id__exact=user.pk,
-            is_published__exact=True,
-            category__is_published__exact=True,
-        ).order_by('-pub_date').annotate(
-            comment_count=Count('comment')
-        )
+        ).order_by('-pub_date')
 
-    paginator = Paginator(posts, 10)
-
-    page_number = request.GET.get('page')
-
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate_posts(
+        request,
+        posts,
+        count_key=f'profile:{username}:{audience}',
+        count_tags=(f'profile:{username}',),
+    )
 
     context = {
         'profile': user,
@@ -157,6 +255,21 @@ def profile(request, username):
     )
 
 
+@never_cache
+def session_state(request):
+    """Данные пользователя для страниц, общих для всех посетителей"""
+    user = request.user
+    state = {
+        'authenticated': user.is_authenticated,
+        'username': user.username,
+        'profile_url': None,
+        'csrf_token': get_token(request),
+    }
+    if user.is_authenticated:
+        state['profile_url'] = reverse('blog:profile', args=[user.username])
+    return JsonResponse(state)
+
+
 def edit_profile(request):
     """Страница редактирования данных пользователя"""
     instance = get_object_or_404(
@@ -213,7 +326,8 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post_id = post_id
-        comment.save()
+        with transaction.atomic():
+            comment.save()
         return redirect(
             'blog:post_detail',
             post_id,
@@ -287,7 +401,8 @@ def delete_comment(request, post_id, comment_id):
     }
 
     if request.method == 'POST':
-        instance.delete()
+        with transaction.atomic():
+            instance.delete()
         return redirect(
             'blog:post_detail',
             post_id,
@@ -310,17 +425,15 @@ def create_post(request):
     if form.is_valid() and request.user.is_authenticated:
         post = form.save(commit=False)
         post.author = request.user
-        category = post.category
-        title = post.title
-        post.save()
-        send_mail(
-            subject='Публикация поста',
-            message=f'Вы опубликовали пост "{title}"'
-            f' в категории "{category}"!',
-            from_email='publish_post@blogicum.not',
-            recipient_list=['admin@blogicum.not'],
-            fail_silently=True,
-        )
+        with transaction.atomic():
+            post.save()
+            OutboxMessage.objects.create(
+                subject='Публикация поста',
+                body=f'Вы опубликовали пост "{post.title}"'
+                f' в категории "{post.category}"!',
+                from_email='publish_post@blogicum.not',
+                recipients=['admin@blogicum.not'],
+            )
         return redirect(
             'blog:profile',
             request.user.username
@@ -360,7 +473,10 @@ def delete_post(request, post_id):
     }
 
     if request.method == 'POST':
-        instance.delete()
+        # Каскад удаляет комментарии пачками по 100, и число запросов
+        # растёт вместе с обсуждением.
+        with outside_query_budget():
+            instance.delete()
         return redirect(
             'blog:index',
         )
@@ -407,3 +523,40 @@ def edit_post(request, post_id):
         'blog/create.html',
         context=context,
     )
+
+
+@staff_member_required
+def export_jsonl(request):
+    """Потоковая выгрузка данных блога в JSON Lines для администраторов
+
+    Параметры: model (можно несколько раз), resume_from=blog.post:1234
+    и gzip=1 для сжатия на лету.
+    """
+    labels = request.GET.getlist('model') or EXPORT_MODELS
+    if not set(labels) <= set(EXPORT_MODELS):
+        return HttpResponseBadRequest('Неизвестная модель')
+    checkpoint = None
+    if request.GET.get('resume_from'):
+        try:
+            checkpoint = parse_checkpoint(request.GET['resume_from'])
+        except ValueError as error:
+            return HttpResponseBadRequest(str(error))
+        if checkpoint[0] not in labels:
+            return HttpResponseBadRequest(
+                'Модель контрольной точки не входит в выгрузку'
+            )
+    compress = request.GET.get('gzip') == '1'
+    lines = (line for _, _, line in iter_export(labels, checkpoint))
+
+    filename = 'blogicum.jsonl'
+    content_type = 'application/x-ndjson; charset=utf-8'
+    if compress:
+        filename += '.gz'
+        content_type = 'application/gzip'
+
+    response = StreamingHttpResponse(
+        iter_blocks(lines, compress=compress),
+        content_type=content_type,
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
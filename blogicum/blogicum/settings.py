@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,10 +47,15 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'blog.middleware.StaticFilesMiddleware',
+    'blog.middleware.QueryBudgetMiddleware',
+    'blog.middleware.ReplicaRoutingMiddleware',
+    'blog.middleware.IdentityMapMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blog.middleware.EdgePersonalizationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -73,6 +79,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'blog.context_processors.personalization',
             ],
         },
     },
@@ -88,10 +95,87 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение живёт между запросами вместо переподключения на каждый.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 600)),
+        'OPTIONS': {
+            # Кэш подготовленных выражений модуля sqlite3 (по умолчанию 128).
+            'cached_statements': 512,
+            # Ожидание блокировки записи в секундах вместо ошибки
+            # «database is locked».
+            'timeout': 5,
+        },
+    }
+}
+
+# Реплики только для чтения: пути к копиям базы через запятую в DB_REPLICAS.
+# Копии обновляет команда sync_replicas.
+DATABASE_REPLICAS = []
+for number, path in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', '').split(',')), start=1
+):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
     }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+# Сколько секунд после изменения данных читать основную базу. Должно
+# превышать отставание реплик.
+DATABASE_REPLICA_STICKY_SECONDS = int(
+    os.getenv('DB_REPLICA_STICKY_SECONDS', 30)
+)
+
+# PRAGMA для каждого нового соединения SQLite (blog.db). Отдельной базе
+# можно задать свой набор ключом PRAGMAS в её настройках.
+# WAL позволяет читать во время записи; synchronous=NORMAL в режиме WAL
+# не теряет целостность, а только последние транзакции при сбое питания.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'memory',
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+PAGE_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blogicum-pages',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'page_cache',
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'pages': PAGE_CACHE_BACKENDS[os.getenv('PAGE_CACHE_BACKEND', 'locmem')],
+}
+
+PAGE_CACHE_ALIAS = 'pages'
+
+PAGE_CACHE_TIMEOUT = 60 * 15
+
+# 'server' — шапка, CSRF-токен и кнопки автора рендерятся для каждого
+# пользователя. 'client' — страница общая для всех и кэшируется в том
+# числе для авторизованных, а данные пользователя подставляет браузер
+# из blog:session_state. 'edge' — страница так же общая, а данные
+# пользователя подставляет на сервере EdgePersonalizationMiddleware.
+PAGE_PERSONALIZATION = os.getenv('PAGE_PERSONALIZATION', 'server')
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -130,6 +214,16 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+STATIC_ROOT = BASE_DIR / 'static'
+
+# В разработке статика раздаётся из STATICFILES_DIRS как есть; в рабочем
+# режиме collectstatic кладёт в STATIC_ROOT файлы с хэшем в имени и их
+# сжатые копии, которые отдаёт blog.middleware.StaticFilesMiddleware.
+if not DEBUG:
+    STATICFILES_STORAGE = (
+        'blog.staticfiles.CompressedManifestStaticFilesStorage'
+    )
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -144,3 +238,5 @@ LOGIN_REDIRECT_URL = 'blog:index'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
+
+QUERY_BUDGET_ACTION = 'raise' if DEBUG else 'log'
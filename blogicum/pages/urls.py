@@ -4,6 +4,8 @@ from . import views
 
 app_name = 'pages'
 
+replica_views = ('about', 'rules')
+
 urlpatterns = [
     path('about/', views.About.as_view(), name='about'),
     path('rules/', views.Rules.as_view(), name='rules'),
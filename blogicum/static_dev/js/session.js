@@ -0,0 +1,81 @@
+// Подстановка данных пользователя в общие для всех закэшированные
+// страницы. Разметка та же, что у blog.holes.splice на сервере:
+// участки <template data-only="..."> и места <!--hole:имя-->.
+(function () {
+  const url = document.currentScript.dataset.sessionUrl;
+  const session = fetch(url, {
+    credentials: 'same-origin',
+    headers: {Accept: 'application/json'},
+  }).then((response) => response.json());
+  const HOLE = /<!--hole:(\w+)-->/g;
+
+  function visible(state, region) {
+    const audience = region.dataset.only;
+    if (audience === 'guest') {
+      return !state.authenticated;
+    }
+    if (!state.authenticated) {
+      return false;
+    }
+    if (audience === 'owner') {
+      return region.dataset.owner === state.username;
+    }
+    return audience === 'user';
+  }
+
+  function holeNode(state, name) {
+    if (name === 'csrf_token') {
+      const input = document.createElement('input');
+      input.type = 'hidden';
+      input.name = 'csrfmiddlewaretoken';
+      input.value = state.csrf_token;
+      return input;
+    }
+    if (name in state) {
+      return document.createTextNode(state[name]);
+    }
+    return null;
+  }
+
+  function fillHoles(state, root) {
+    const walker = document.createTreeWalker(root, NodeFilter.SHOW_COMMENT);
+    const holes = [];
+    while (walker.nextNode()) {
+      const match = /^hole:(\w+)$/.exec(walker.currentNode.data);
+      if (match) {
+        holes.push([walker.currentNode, match[1]]);
+      }
+    }
+    holes.forEach(([comment, name]) => {
+      const node = holeNode(state, name);
+      if (node) {
+        comment.replaceWith(node);
+      }
+    });
+    root.querySelectorAll('*').forEach((element) => {
+      Array.from(element.attributes).forEach((attribute) => {
+        if (attribute.value.includes('<!--hole:')) {
+          attribute.value = attribute.value.replace(
+            HOLE, (marker, name) => (name in state ? state[name] : marker),
+          );
+        }
+      });
+    });
+  }
+
+  function personalize(root) {
+    session.then((state) => {
+      root.querySelectorAll('template[data-only]').forEach((region) => {
+        if (visible(state, region)) {
+          region.replaceWith(region.content);
+        } else {
+          region.remove();
+        }
+      });
+      fillHoles(state, root);
+    });
+  }
+
+  window.blogicumPersonalize = personalize;
+  document.addEventListener('DOMContentLoaded', () => personalize(document));
+})();
@@ -79,6 +79,18 @@ def post_of_another_author(
     )
 
 
+@pytest.fixture
+def visible_post(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location__is_published=True,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
 @pytest.fixture
 def post_with_published_location(
         mixer: Mixer, user, published_location, published_category):
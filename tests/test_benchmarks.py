@@ -0,0 +1,35 @@
+import pytest
+
+from blog.benchmarks import check_scaling, compare, run_benchmarks
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_run_benchmarks_reports_every_view(user):
+    results = run_benchmarks([15, 30], user, repeats=2, warmup=1)
+    assert set(results) == {
+        'index', 'index_deep_keyset', 'category_posts', 'post_detail',
+        'profile', 'add_comment', 'create_post',
+    }
+    for scales in results.values():
+        assert set(scales) == {'15', '30'}
+        for metrics in scales.values():
+            assert metrics['p50_ms'] <= metrics['p99_ms']
+            assert metrics['queries'] > 0
+            assert metrics['peak_kib'] > 0
+
+
+def test_regressions_are_reported():
+    baseline = {'index': {'1000': {'p50_ms': 10, 'queries': 3}}}
+    slower = {'index': {'1000': {'p50_ms': 20, 'queries': 4}}}
+    assert len(compare(slower, baseline, tolerance=1.5)) == 2
+    assert compare(baseline, baseline) == []
+
+    linear = {'index': {
+        '1000': {'p50_ms': 10, 'queries': 3},
+        '100000': {'p50_ms': 900, 'queries': 3},
+    }}
+    assert check_scaling(linear, max_growth=3), (
+        'Убедитесь, что рост медианы вместе с объёмом данных считается'
+        ' регрессией.'
+    )
@@ -0,0 +1,65 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def client_personalization(settings):
+    settings.PAGE_PERSONALIZATION = 'client'
+
+
+def test_post_page_shared_by_users(
+        user_client, another_user_client, visible_post,
+        django_assert_num_queries
+):
+    url = f'/posts/{visible_post.id}/'
+    first = user_client.get(url)
+    # Сессия и пользователь всё равно загружаются middleware.
+    with django_assert_num_queries(2):
+        second = another_user_client.get(url)
+    assert second.content == first.content, (
+        'Убедитесь, что в режиме PAGE_PERSONALIZATION = "client" страница'
+        ' поста одна для всех пользователей и отдаётся из кэша.'
+    )
+    content = first.content.decode('utf-8')
+    assert '<!--hole:csrf_token-->' in content, (
+        'Убедитесь, что форма комментария получает CSRF-токен из браузера.'
+    )
+    assert visible_post.author.username not in content.split('<main>')[0], (
+        'Убедитесь, что имя пользователя не попадает в общую шапку.'
+    )
+
+
+def test_session_state(user, user_client):
+    response = user_client.get('/session/')
+    state = response.json()
+    assert state['authenticated'] is True
+    assert state['username'] == user.username
+    assert state['profile_url'] == f'/profile/{user.username}/'
+    assert state['csrf_token'], (
+        'Убедитесь, что /session/ возвращает CSRF-токен для форм.'
+    )
+    assert 'no-cache' in response['Cache-Control'], (
+        'Убедитесь, что ответ /session/ не кэшируется.'
+    )
+
+
+def test_private_pages_not_shared(
+        user, user_client, another_user_client, visible_post
+):
+    visible_post.is_published = False
+    visible_post.save()
+    url = f'/posts/{visible_post.id}/'
+    assert user_client.get(url).status_code == 200
+    assert another_user_client.get(url).status_code == 404, (
+        'Убедитесь, что снятый с публикации пост, открытый автором,'
+        ' не попадает в общий кэш.'
+    )
+
+    profile_url = f'/profile/{user.username}/'
+    user_client.get(profile_url)
+    content = another_user_client.get(profile_url).content.decode('utf-8')
+    assert visible_post.title not in content, (
+        'Убедитесь, что собственный профиль с черновиками не попадает'
+        ' в общий кэш.'
+    )
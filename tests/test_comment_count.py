@@ -0,0 +1,75 @@
+import pytest
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(mixer: Mixer, user):
+    from blog.models import Comment, Post
+
+    post = mixer.blend('blog.Post', author=user)
+    comments = mixer.cycle(3).blend('blog.Comment', post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        'Убедитесь, что при создании комментария счётчик `comment_count`'
+        ' публикации увеличивается.'
+    )
+
+    comments[0].delete()
+    Comment.objects.filter(pk=comments[1].pk).delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        'Убедитесь, что при удалении комментария счётчик `comment_count`'
+        ' публикации уменьшается.'
+    )
+
+    stale = Post.objects.get(pk=post.pk)
+    mixer.blend('blog.Comment', post=post)
+    stale.title = 'Новый заголовок'
+    stale.save()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что сохранение публикации не перезаписывает счётчик'
+        ' комментариев устаревшим значением.'
+    )
+
+
+def test_sync_comment_counts_fixes_drift(mixer: Mixer, user):
+    from blog.models import Post
+
+    posts = mixer.cycle(3).blend('blog.Post', author=user)
+    mixer.cycle(2).blend('blog.Comment', post=posts[0])
+    Post.objects.update(comment_count=7)
+
+    call_command('sync_comment_counts', chunk_size=2)
+
+    counts = dict(Post.objects.values_list('pk', 'comment_count'))
+    assert counts == {posts[0].pk: 2, posts[1].pk: 0, posts[2].pk: 0}, (
+        'Убедитесь, что команда `sync_comment_counts` исправляет'
+        ' расхождения в счётчиках комментариев.'
+    )
+
+
+def test_failed_post_delete_keeps_counting(mixer: Mixer, user, monkeypatch):
+    from django.db.models.deletion import Collector
+
+    from blog.models import Post, deleting_posts
+
+    post = mixer.blend('blog.Post', author=user)
+    comments = mixer.cycle(2).blend('blog.Comment', post=post)
+
+    def broken_delete(self):
+        raise RuntimeError
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Collector, 'delete', broken_delete)
+        with pytest.raises(RuntimeError):
+            post.delete()
+    assert post.pk not in deleting_posts.get()
+
+    comments[0].delete()
+    assert Post.objects.get(pk=post.pk).comment_count == 1, (
+        'Убедитесь, что после неудачного удаления поста счётчик его'
+        ' комментариев снова пересчитывается.'
+    )
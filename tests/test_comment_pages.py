@@ -0,0 +1,47 @@
+import re
+
+import pytest
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comments_loaded_in_chunks(
+        mixer: Mixer, user_client, post_with_published_location
+):
+    from blog.paginators import COMMENTS_PER_PAGE
+
+    post = post_with_published_location
+    comments = mixer.cycle(COMMENTS_PER_PAGE + 5).blend(
+        'blog.Comment', post=post
+    )
+    content = user_client.get(f'/posts/{post.id}/').content.decode('utf-8')
+    shown = set(map(int, re.findall(r'name="comment_(\d+)"', content)))
+    assert shown == {comment.id for comment in comments[:COMMENTS_PER_PAGE]}, (
+        'Убедитесь, что на странице поста выводится только первая порция'
+        ' комментариев.'
+    )
+
+    more_url = re.search(
+        r'href="([^"]+)"\s+data-comments-more', content
+    ).group(1).replace('&amp;', '&')
+    fragment = user_client.get(more_url)
+    assert fragment.status_code == 200
+    fragment_content = fragment.content.decode('utf-8')
+    rest = set(map(int, re.findall(r'name="comment_(\d+)"', fragment_content)))
+    assert rest == {comment.id for comment in comments[COMMENTS_PER_PAGE:]}, (
+        'Убедитесь, что адрес «Показать ещё» возвращает следующую порцию'
+        ' комментариев.'
+    )
+    assert '<html' not in fragment_content
+    assert 'data-comments-more' not in fragment_content
+
+
+def test_comments_of_unpublished_post_hidden(
+        mixer: Mixer, another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = another_user_client.get(f'/posts/{post.id}/comments/')
+    assert response.status_code == 404
@@ -0,0 +1,69 @@
+import pytest
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def page_urls(post):
+    return (
+        '/',
+        f'/posts/{post.id}/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+    )
+
+
+def test_not_modified_for_anonymous(
+        mixer: Mixer, unlogged_client, visible_post, django_assert_num_queries
+):
+    for url in page_urls(visible_post):
+        response = unlogged_client.get(url)
+        assert response.has_header('ETag') and response.has_header(
+            'Last-Modified'
+        ), f'Убедитесь, что страница {url} отдаёт ETag и Last-Modified.'
+        with django_assert_num_queries(0):
+            not_modified = unlogged_client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        assert not_modified.status_code == 304
+        by_date = unlogged_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert by_date.status_code == 304
+
+    etags = {
+        url: unlogged_client.get(url)['ETag']
+        for url in page_urls(visible_post)
+    }
+    mixer.blend('blog.Comment', post=visible_post)
+    for url, etag in etags.items():
+        response = unlogged_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f'Убедитесь, что ETag страницы {url} меняется после добавления'
+            ' комментария.'
+        )
+
+
+def test_etag_depends_on_user(
+        user_client, another_user_client, unlogged_client, visible_post
+):
+    etag = user_client.get('/')['ETag']
+    assert not user_client.get('/').has_header('Last-Modified')
+    assert user_client.get('/', HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert another_user_client.get(
+        '/', HTTP_IF_NONE_MATCH=etag
+    ).status_code == 200
+    assert unlogged_client.get(
+        '/', HTTP_IF_NONE_MATCH=etag
+    ).status_code == 200
+
+
+def test_seed_dump_loads_without_updated_at(settings):
+    from blog.models import Post
+
+    call_command('loaddata', settings.BASE_DIR / '..' / 'db.json', verbosity=0)
+    assert Post.objects.exists()
+    assert not Post.objects.filter(updated_at__isnull=True).exists(), (
+        'Убедитесь, что дамп без поля updated_at загружается через loaddata.'
+    )
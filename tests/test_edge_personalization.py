@@ -0,0 +1,94 @@
+import pytest
+from django.http import HttpResponse
+
+from blog.holes import splice
+from blog.middleware import EdgePersonalizationMiddleware
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def edge_personalization(settings):
+    settings.PAGE_PERSONALIZATION = 'edge'
+
+
+def test_user_fragments_spliced_into_cached_page(
+        user, another_user, user_client, another_user_client,
+        unlogged_client, visible_post, django_assert_num_queries
+):
+    url = f'/posts/{visible_post.id}/'
+    edit_url = f'/posts/{visible_post.id}/edit/'
+    own = user_client.get(url).content.decode('utf-8')
+    # Сессия и пользователь всё равно загружаются middleware.
+    with django_assert_num_queries(2):
+        response = another_user_client.get(url)
+    foreign = response.content.decode('utf-8')
+    anonymous = unlogged_client.get(url).content.decode('utf-8')
+
+    assert edit_url in own and edit_url not in foreign, (
+        'Убедитесь, что кнопки редактирования поста видит только автор,'
+        ' хотя страница рендерится один раз для всех.'
+    )
+    assert f'/profile/{another_user.username}/' in foreign, (
+        'Убедитесь, что в шапку подставляется ссылка на профиль'
+        ' текущего пользователя.'
+    )
+    assert 'csrfmiddlewaretoken" value="' in foreign, (
+        'Убедитесь, что в форму комментария подставляется CSRF-токен.'
+    )
+    assert '/auth/login/' in anonymous
+    assert 'csrfmiddlewaretoken' not in anonymous, (
+        'Убедитесь, что анонимный посетитель не видит форму комментария.'
+    )
+    for content in (own, foreign, anonymous):
+        assert 'data-only' not in content and '<!--hole:' not in content, (
+            'Убедитесь, что разметка подстановки не попадает в ответ.'
+        )
+
+
+def test_comment_form_token_accepted(user_client, visible_post):
+    user_client.get(f'/posts/{visible_post.id}/')
+    user_client.handler.enforce_csrf_checks = True
+    content = user_client.get(
+        f'/posts/{visible_post.id}/'
+    ).content.decode('utf-8')
+    token = content.split('csrfmiddlewaretoken" value="')[1].split('"')[0]
+    response = user_client.post(
+        f'/posts/{visible_post.id}/comment/',
+        {'text': 'Комментарий', 'csrfmiddlewaretoken': token},
+    )
+    assert response.status_code == 302, (
+        'Убедитесь, что подставленный CSRF-токен принимается формой.'
+    )
+
+
+def test_only_shared_responses_spliced(rf, user, settings):
+    markup = b'<template data-only="user">x</template><!--hole:username-->'
+
+    def respond(shared):
+        def view(request):
+            response = HttpResponse(markup)
+            response.shared_page = shared
+            return response
+        request = rf.get('/')
+        request.user = user
+        return EdgePersonalizationMiddleware(view)(request).content
+
+    assert respond(shared=False) == markup, (
+        'Убедитесь, что страницы, не отмеченные как общие, например'
+        ' админка, не изменяются при подстановке.'
+    )
+    assert respond(shared=True) == b'x' + user.username.encode()
+    settings.PAGE_PERSONALIZATION = 'server'
+    assert respond(shared=True) == markup, (
+        'Убедитесь, что режим PAGE_PERSONALIZATION проверяется'
+        ' на каждом запросе.'
+    )
+
+
+def test_unknown_hole_kept(rf, user):
+    request = rf.get('/')
+    request.user = user
+    assert splice(b'<!--hole:unknown-->', request) == b'<!--hole:unknown-->', (
+        'Убедитесь, что неизвестное место для данных не ломает страницу.'
+    )
@@ -0,0 +1,99 @@
+import gzip
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.test import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def admin_client(django_user_model):
+    admin = django_user_model.objects.create_superuser(
+        username='admin', email='admin@blogicum.not', password='password'
+    )
+    client = Client()
+    client.force_login(admin)
+    return client
+
+
+@pytest.fixture
+def post_comment(mixer, user, post_with_published_location):
+    return mixer.blend(
+        'blog.Comment', post=post_with_published_location, author=user
+    )
+
+
+def read_lines(data):
+    return [json.loads(line) for line in data.decode().splitlines()]
+
+
+def test_export_command_resumes_from_checkpoint(
+        tmp_path, post_with_published_location, post_comment
+):
+    from blog.models import Post
+
+    path = tmp_path / 'export.jsonl.gz'
+    stderr = io.StringIO()
+    call_command('export_jsonl', str(path), chunk_size=1, stderr=stderr)
+    with gzip.open(path) as export:
+        records = read_lines(export.read())
+    assert [record['model'] for record in records] == [
+        'blog.category', 'blog.location', 'blog.post', 'blog.comment',
+    ]
+    assert f'blog.comment:{post_comment.pk}' in stderr.getvalue()
+
+    extra = Post.objects.get(pk=post_with_published_location.pk)
+    extra.pk = None
+    extra.save()
+    call_command(
+        'export_jsonl', str(path),
+        models=['blog.post'],
+        resume_from=f'blog.post:{post_with_published_location.pk}',
+        stderr=io.StringIO(),
+    )
+    with gzip.open(path) as export:
+        records = read_lines(export.read())
+    assert len(records) == 5, (
+        'Убедитесь, что выгрузка с контрольной точки дописывает только'
+        ' новые объекты.'
+    )
+    assert records[-1]['pk'] == extra.pk
+
+
+def test_export_endpoint_streams_for_staff_only(
+        admin_client, user_client, post_with_published_location
+):
+    url = '/export/?model=blog.post'
+    assert user_client.get(url).status_code == 302
+
+    response = admin_client.get(url)
+    assert response.streaming
+    records = read_lines(b''.join(response.streaming_content))
+    assert [record['pk'] for record in records] == [
+        post_with_published_location.pk
+    ]
+
+    response = admin_client.get(url + '&gzip=1')
+    assert response['Content-Type'] == 'application/gzip'
+    data = gzip.decompress(b''.join(response.streaming_content))
+    assert read_lines(data) == records
+
+    assert admin_client.get('/export/?model=auth.user').status_code == 400
+
+
+def test_import_dump_reads_exported_jsonl(
+        tmp_path, post_with_published_location, post_comment
+):
+    from blog.models import Comment, Post
+
+    path = tmp_path / 'export.jsonl'
+    call_command('export_jsonl', str(path), stderr=io.StringIO())
+    Comment.objects.all().delete()
+    call_command(
+        'import_dump', str(path), skip_existing=True, stdout=io.StringIO()
+    )
+    assert Comment.objects.get().pk == post_comment.pk
+    assert Post.objects.get().comment_count == 1
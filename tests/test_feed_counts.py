@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    return response, [
+        query['sql'] for query in context.captured_queries
+        if 'COUNT(' in query['sql']
+    ]
+
+
+def test_feed_count_cached_and_invalidated(
+        mixer: Mixer, user_client, user, published_category
+):
+    mixer.cycle(12).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    urls = ('/', f'/category/{published_category.slug}/',
+            f'/profile/{user.username}/')
+    for url in urls:
+        response, counts = count_queries(user_client, url)
+        assert response.context['page_obj'].paginator.count == 12
+        assert len(counts) == 1
+        _, counts = count_queries(user_client, url)
+        assert not counts, (
+            f'Убедитесь, что число публикаций на странице {url} берётся из'
+            ' кэша при повторном запросе.'
+        )
+
+    mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    for url in urls:
+        response, _ = count_queries(user_client, url)
+        assert response.context['page_obj'].paginator.count == 13, (
+            f'Убедитесь, что число публикаций на странице {url} обновляется'
+            ' после добавления публикации.'
+        )
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+from blog.rows import PostRow
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category, published_location):
+    return [
+        mixer.blend(
+            'blog.Post',
+            author=user,
+            category=published_category,
+            location=location,
+            is_published=True,
+            pub_date=timezone.now() - timedelta(days=1),
+        )
+        for location in (published_location, None)
+    ]
+
+
+def test_rows_render_same_cards_as_models(
+        feed_posts, django_assert_num_queries
+):
+    with django_assert_num_queries(1):
+        rows = list(Post.objects.rows().order_by('pk'))
+    assert all(isinstance(row, PostRow) for row in rows)
+    models = Post.objects.select_related(
+        'author', 'category', 'location'
+    ).order_by('pk')
+    for row, post in zip(rows, models):
+        assert render_to_string(
+            'includes/post_card.html', {'post': row}
+        ) == render_to_string('includes/post_card.html', {'post': post}), (
+            'Убедитесь, что карточка из PostRow совпадает с карточкой'
+            ' из экземпляра Post.'
+        )
+
+
+def test_rows_render_cards_in_one_query(
+        feed_posts, django_assert_num_queries
+):
+    with django_assert_num_queries(1):
+        for row in Post.objects.rows():
+            render_to_string('includes/post_card.html', {'post': row})
+    with CaptureQueriesContext(connection) as context:
+        for post in Post.objects.all():
+            render_to_string('includes/post_card.html', {'post': post})
+    assert len(context.captured_queries) > len(feed_posts), (
+        'Убедитесь, что карточки из PostRow не догружают связанные объекты'
+        ' отдельными запросами, в отличие от экземпляров Post.'
+    )
@@ -0,0 +1,67 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_generate_dataset_creates_skewed_data(settings, tmp_path):
+    from blog.models import Comment, Post
+
+    settings.MEDIA_ROOT = tmp_path
+    call_command(
+        'generate_dataset',
+        users=20, categories=5, locations=5, posts=200, comments=2000,
+        batch_size=150, image_ratio=0.5, stdout=io.StringIO(),
+    )
+    assert Post.objects.count() == 200
+    assert Comment.objects.count() == 2000
+    assert Post.objects.filter(is_published=False).exists()
+    assert Post.objects.filter(pub_date__gt=timezone.now()).exists()
+    assert Post.objects.exclude(image='').exists()
+    assert (tmp_path / 'post_images' / 'generated').is_dir()
+
+    counts = list(
+        Post.objects.order_by('-comment_count').values_list(
+            'comment_count', flat=True
+        )
+    )
+    assert counts == list(
+        Post.objects.annotate(total=Count('comment')).order_by(
+            '-total'
+        ).values_list('total', flat=True)
+    ), 'Убедитесь, что счётчики комментариев согласованы с данными.'
+    assert sum(counts[:20]) > sum(counts) / 2, (
+        'Убедитесь, что комментарии распределены неравномерно.'
+    )
+    first_comment = Comment.objects.select_related('post').first()
+    assert first_comment.created_at >= min(
+        first_comment.post.pub_date, timezone.now()
+    )
+
+
+def test_generate_dataset_reuses_existing_rows():
+    from django.core.management.base import CommandError
+
+    from blog.models import Comment
+
+    with pytest.raises(CommandError):
+        call_command(
+            'generate_dataset', users=0, posts=10, comments=0,
+            stdout=io.StringIO(),
+        )
+    call_command(
+        'generate_dataset', users=5, categories=2, locations=0, posts=10,
+        comments=0, image_ratio=0, stdout=io.StringIO(),
+    )
+    call_command(
+        'generate_dataset', users=0, categories=0, locations=0, posts=0,
+        comments=30, image_ratio=0, stdout=io.StringIO(),
+    )
+    assert Comment.objects.count() == 30, (
+        'Убедитесь, что при --posts 0 комментарии достаются уже имеющимся'
+        ' публикациям.'
+    )
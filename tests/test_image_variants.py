@@ -0,0 +1,91 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def make_image(name='photo.jpg', size=(2000, 1000)):
+    buffer = BytesIO()
+    Image.new('RGB', size, (120, 60, 30)).save(buffer, format='JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/jpeg')
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def post_with_image(media_root, mixer, user, published_category):
+    from blog.models import Post
+
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        location=None,
+    )
+    post.image = make_image()
+    post.save()
+    return Post.objects.get(pk=post.pk)
+
+
+def test_variants_are_built_off_request_path(
+        media_root, post_with_image, client
+):
+    assert post_with_image.image_variants == {}
+    assert post_with_image.card_image is None
+
+    call_command('build_image_variants', once=True, workers=1)
+    post_with_image.refresh_from_db()
+    variants = post_with_image.image_variants['variants']
+    assert variants['card']['width'] == 640
+    assert variants['card']['height'] == 320
+    assert variants['detail']['width'] == 1280
+    for variant in variants.values():
+        assert (media_root / variant['webp']).exists()
+        assert (media_root / variant['jpeg']).exists()
+
+    content = client.get('/').content.decode()
+    assert 'type="image/webp"' in content
+    assert 'width="640" height="320"' in content
+    assert 'loading="lazy"' in content, (
+        'Убедитесь, что фото в ленте загружаются лениво.'
+    )
+    detail = client.get(f'/posts/{post_with_image.pk}/').content.decode()
+    assert 'width="1280" height="640"' in detail
+    assert '640w' in detail and '1280w' in detail
+
+
+def test_replacing_image_requeues_variants(media_root, post_with_image):
+    from blog.models import Post
+
+    call_command('build_image_variants', once=True, workers=1)
+    post = Post.objects.get(pk=post_with_image.pk)
+    post.title = 'Новый заголовок'
+    post.save()
+    post.refresh_from_db()
+    assert post.image_variants, (
+        'Убедитесь, что сохранение поста без замены фото не сбрасывает'
+        ' готовые варианты.'
+    )
+
+    post.image = make_image('small.jpg', size=(300, 200))
+    post.save()
+    post.refresh_from_db()
+    assert post.image_variants == {}
+    assert post.detail_image is None
+
+    call_command('build_image_variants', once=True, workers=1)
+    post.refresh_from_db()
+    variants = post.image_variants['variants']
+    assert variants['detail']['width'] == 300, (
+        'Убедитесь, что маленькие фото не растягиваются.'
+    )
+    assert len(list((media_root / 'post_images' / 'variants').iterdir())) == 4
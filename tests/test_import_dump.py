@@ -0,0 +1,111 @@
+import gzip
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+from blog.bulk_io import iter_json_array
+
+pytestmark = [pytest.mark.django_db]
+
+
+def dump_records(user):
+    # Комментарии идут раньше поста, на который ссылаются.
+    return [
+        *(
+            {
+                'model': 'blog.comment',
+                'pk': pk,
+                'fields': {
+                    'text': f'Комментарий {pk}',
+                    'post': 10,
+                    'author': user.pk,
+                    'created_at': f'2023-01-0{pk}T00:00:00Z',
+                },
+            }
+            for pk in range(1, 4)
+        ),
+        {
+            'model': 'blog.category',
+            'pk': 5,
+            'fields': {
+                'title': 'Категория',
+                'description': 'Описание',
+                'slug': 'imported',
+                'is_published': True,
+                'created_at': '2023-01-01T00:00:00Z',
+            },
+        },
+        {
+            'model': 'blog.post',
+            'pk': 10,
+            'fields': {
+                'title': 'Импортированный пост',
+                'text': 'Текст',
+                'pub_date': '2023-01-01T00:00:00Z',
+                'author': user.pk,
+                'category': 5,
+                'is_published': True,
+                'created_at': '2023-01-01T00:00:00Z',
+            },
+        },
+    ]
+
+
+def test_iter_json_array_reads_in_small_pieces():
+    records = [{'n': n, 'text': 'x' * n} for n in range(50)] + [123456, []]
+    stream = io.StringIO(json.dumps(records, indent=2))
+    assert list(iter_json_array(stream, read_size=7)) == records
+    assert list(iter_json_array(io.StringIO(' [ ] '))) == []
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('[{"a": 1}, {"b"')))
+
+
+def test_import_dump_bulk_loads_chunks(tmp_path, user):
+    from blog.models import Comment, Post
+
+    path = tmp_path / 'dump.json.gz'
+    with gzip.open(path, 'wt', encoding='utf-8') as dump:
+        json.dump(dump_records(user), dump)
+
+    call_command(
+        'import_dump', str(path),
+        chunk_size=2, batch_size=2, read_size=64, stdout=io.StringIO(),
+    )
+    post = Post.objects.get(pk=10)
+    assert post.category.slug == 'imported'
+    assert Comment.objects.filter(post=post).count() == 3
+    assert post.comment_count == 3, (
+        'Убедитесь, что после загрузки дампа счётчики комментариев'
+        ' пересчитываются.'
+    )
+    assert list(Post.objects.search('импортированный')) == [post]
+    assert post.created_at.isoformat() == '2023-01-01T00:00:00+00:00'
+    assert [
+        comment.created_at.day
+        for comment in Comment.objects.order_by('pk')
+    ] == [1, 2, 3], (
+        'Убедитесь, что даты auto_now_add загружаются из дампа, а не'
+        ' заменяются временем загрузки.'
+    )
+
+
+def test_import_dump_does_not_overwrite(tmp_path, user):
+    from django.core.management.base import CommandError
+
+    from blog.models import Category
+
+    path = tmp_path / 'dump.json'
+    path.write_text(json.dumps(dump_records(user)), encoding='utf-8')
+    call_command('import_dump', str(path), stdout=io.StringIO())
+    Category.objects.filter(pk=5).update(title='Изменённая')
+
+    with pytest.raises(CommandError):
+        call_command('import_dump', str(path), stdout=io.StringIO())
+    call_command(
+        'import_dump', str(path), skip_existing=True, stdout=io.StringIO(),
+    )
+    assert Category.objects.get(pk=5).title == 'Изменённая', (
+        'Убедитесь, что с --skip-existing существующие строки пропускаются.'
+    )
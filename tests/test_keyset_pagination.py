@@ -0,0 +1,83 @@
+from datetime import timedelta
+from urllib.parse import parse_qs
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_published_posts(mixer: Mixer, user, published_category):
+    now = timezone.now()
+    pub_dates = (now - timedelta(days=day) for day in range(1, 100))
+    return mixer.cycle(N_PER_PAGE * 6 + 2).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=pub_dates,
+    )
+
+
+def test_cursor_pages_cover_feed(user_client, many_published_posts):
+    expected_ids = [
+        post.id for post in sorted(
+            many_published_posts, key=lambda post: post.pub_date,
+            reverse=True,
+        )
+    ]
+    seen_ids = []
+    query = 'page=1'
+    pages = []
+    while query:
+        page_obj = user_client.get(f'/?{query}').context['page_obj']
+        pages.append(page_obj)
+        seen_ids.extend(post.id for post in page_obj)
+        query = page_obj.next_query
+    assert seen_ids == expected_ids, (
+        'Убедитесь, что переход по ссылкам «>>» последовательно показывает'
+        ' все публикации ленты без пропусков и повторов.'
+    )
+    last_page = pages[-1]
+    assert last_page.is_keyset
+
+    previous = user_client.get(
+        f'/?{pages[-1].previous_query}'
+    ).context['page_obj']
+    assert [post.id for post in previous] == [
+        post.id for post in pages[-2]
+    ], 'Убедитесь, что ссылка «<<» по курсору возвращает предыдущую страницу.'
+
+
+def test_next_link_switches_to_cursor_after_shallow_pages(
+        user_client, many_published_posts
+):
+    from blog import paginators
+
+    assert len(many_published_posts) > (
+        paginators.MAX_NUMBERED_PAGES * paginators.POSTS_PER_PAGE
+    )
+    page_obj = user_client.get(
+        f'/?page={paginators.MAX_NUMBERED_PAGES}'
+    ).context['page_obj']
+    assert page_obj.has_next()
+    assert 'after' in parse_qs(page_obj.next_query), (
+        'Убедитесь, что после последней нумерованной страницы ссылка «>>»'
+        ' ведёт на страницу по курсору.'
+    )
+
+    deep_page = user_client.get('/?page=100000').context['page_obj']
+    assert deep_page.number <= paginators.MAX_NUMBERED_PAGES, (
+        'Убедитесь, что нумерованные страницы доступны только для первых'
+        ' страниц ленты.'
+    )
+
+
+def test_invalid_cursor_shows_first_page(user_client, many_published_posts):
+    first = user_client.get('/').context['page_obj']
+    broken = user_client.get('/?after=not-a-cursor').context['page_obj']
+    assert [post.id for post in broken] == [post.id for post in first]
@@ -0,0 +1,83 @@
+import gc
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.loader import batched_loading, current_loader
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts_with_comments(mixer: Mixer, user, another_user, published_category):
+    posts = mixer.cycle(4).blend(
+        'blog.Post',
+        author=(author for author in (user, another_user) * 2),
+        category=published_category,
+        location=None,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    for post in posts:
+        mixer.cycle(2).blend('blog.Comment', post=post, author=user)
+    return posts
+
+
+def test_foreign_keys_loaded_in_batches(
+        posts_with_comments, django_assert_num_queries
+):
+    with batched_loading():
+        with django_assert_num_queries(3):
+            posts = list(Post.objects.all())
+            authors = {post.author.username for post in posts}
+            categories = {post.category for post in posts}
+        assert len(authors) == 2 and len(categories) == 1
+        assert all(post.location is None for post in posts)
+
+        with django_assert_num_queries(1):
+            comments = list(Comment.objects.all())
+            assert {comment.author for comment in comments} == {
+                posts[0].author
+            }, 'Уже загруженные пользователи берутся из карты идентичности.'
+    assert current_loader.get() is None
+
+
+def test_loader_active_only_during_request(posts_with_comments, user_client):
+    active = []
+
+    def record(execute, sql, params, many, context):
+        active.append(current_loader.get() is not None)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(record):
+        user_client.get(f'/posts/{posts_with_comments[0].id}/')
+    assert active and all(active), (
+        'Убедитесь, что пакетная загрузка включена на время запроса.'
+    )
+    assert current_loader.get() is None, (
+        'Убедитесь, что загрузчик очищается после запроса.'
+    )
+
+
+def test_released_instances_not_kept(
+        posts_with_comments, django_assert_num_queries
+):
+    with batched_loading():
+        loader = current_loader.get()
+        kept = list(Post.objects.all())
+        list(Comment.objects.all())
+        gc.collect()
+        queued = [
+            ref() for refs in loader.pending.values() for ref in refs
+        ]
+        assert {obj for obj in queued if obj is not None} == set(kept), (
+            'Убедитесь, что очередь загрузчика не удерживает экземпляры,'
+            ' которые представление уже отпустило.'
+        )
+        with django_assert_num_queries(1):
+            authors = {post.author.pk for post in kept}
+    assert len(authors) == 2
@@ -0,0 +1,67 @@
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def locmem_email(settings):
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+def test_create_post_enqueues_email(
+        locmem_email, user_client, published_category
+):
+    from blog.models import OutboxMessage
+
+    response = user_client.post('/posts/create/', {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'category': published_category.id,
+        'is_published': True,
+        'pub_date': '2020-01-01',
+    })
+    assert response.status_code == 302
+    assert not mail.outbox, (
+        'Убедитесь, что при создании публикации письмо не отправляется'
+        ' синхронно, а ставится в очередь.'
+    )
+    message = OutboxMessage.objects.get()
+    assert message.status == OutboxMessage.PENDING
+    assert 'Заголовок' in message.body
+
+    call_command('deliver_outbox', once=True)
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].to == ['admin@blogicum.not']
+    message.refresh_from_db()
+    assert message.status == OutboxMessage.SENT
+
+
+def test_failed_delivery_is_retried_later(locmem_email, monkeypatch):
+    from django.core.mail.backends.locmem import EmailBackend
+
+    from blog.models import OutboxMessage
+
+    def broken_send(self, messages):
+        raise ConnectionError('почтовый сервер недоступен')
+
+    monkeypatch.setattr(EmailBackend, 'send_messages', broken_send)
+    message = OutboxMessage.objects.create(
+        subject='Тема',
+        body='Текст',
+        from_email='from@blogicum.not',
+        recipients=['to@blogicum.not'],
+    )
+    call_command('deliver_outbox', once=True, max_attempts=2)
+    message.refresh_from_db()
+    assert message.status == OutboxMessage.PENDING
+    assert message.attempts == 1
+    assert message.next_attempt_at > timezone.now()
+    assert 'недоступен' in message.last_error
+
+    OutboxMessage.objects.update(next_attempt_at=timezone.now())
+    call_command('deliver_outbox', once=True, max_attempts=2)
+    message.refresh_from_db()
+    assert message.status == OutboxMessage.FAILED
@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_pages_served_from_cache(
+        unlogged_client, visible_post, django_assert_num_queries
+):
+    urls = (
+        '/',
+        f'/posts/{visible_post.id}/',
+        f'/category/{visible_post.category.slug}/',
+        f'/profile/{visible_post.author.username}/',
+    )
+    for url in urls:
+        first = unlogged_client.get(url)
+        with django_assert_num_queries(0):
+            second = unlogged_client.get(url)
+        assert second.content == first.content, (
+            f'Убедитесь, что страница {url} для анонимных посетителей'
+            ' отдаётся из кэша.'
+        )
+
+
+def test_logged_in_pages_not_cached(user_client, visible_post):
+    user_client.get('/')
+    response = user_client.get('/')
+    assert response.context is not None
+
+
+def test_post_and_comment_changes_invalidate_pages(
+        mixer: Mixer, unlogged_client, visible_post
+):
+    post_url = f'/posts/{visible_post.id}/'
+    category_url = f'/category/{visible_post.category.slug}/'
+    unlogged_client.get('/')
+    unlogged_client.get(post_url)
+    unlogged_client.get(category_url)
+
+    visible_post.title = 'Изменённый заголовок'
+    visible_post.save()
+    for url in ('/', post_url, category_url):
+        content = unlogged_client.get(url).content.decode('utf-8')
+        assert 'Изменённый заголовок' in content, (
+            f'Убедитесь, что кэш страницы {url} сбрасывается при изменении'
+            ' публикации.'
+        )
+
+    mixer.blend('blog.Comment', post=visible_post, text='Свежий комментарий')
+    assert 'Свежий комментарий' in unlogged_client.get(post_url).content.decode(
+        'utf-8'
+    )
+    assert '(1)' in unlogged_client.get('/').content.decode('utf-8')
+
+
+def test_catalog_changes_invalidate_pages(unlogged_client, visible_post):
+    unlogged_client.get('/')
+    category = visible_post.category
+    category.title = 'Новое название категории'
+    category.save()
+    assert 'Новое название категории' in unlogged_client.get(
+        '/'
+    ).content.decode('utf-8')
+
+
+def test_scheduled_post_appears_on_time(
+        mixer: Mixer, unlogged_client, visible_post, published_category
+):
+    from blog.publishing import release_due_posts
+
+    scheduled = mixer.blend(
+        'blog.Post',
+        category=published_category,
+        is_published=True,
+        title='Отложенная публикация',
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    assert scheduled.title not in unlogged_client.get('/').content.decode(
+        'utf-8'
+    )
+    assert release_due_posts(scheduled.pub_date) == 1
+    assert scheduled.title in unlogged_client.get('/').content.decode(
+        'utf-8'
+    ), (
+        'Убедитесь, что открытие отложенной публикации сбрасывает кэш'
+        ' ленты.'
+    )
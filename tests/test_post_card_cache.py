@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+import pytest
+from django.template import Context, Template
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+CARDS_TEMPLATE = Template(
+    '{% load post_cards %}{% post_cards posts as cards %}'
+    '{% for card in cards %}{{ card }}{% endfor %}'
+)
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    return mixer.cycle(3).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def render_cards(posts):
+    from blog.models import Post
+
+    posts = Post.objects.select_related(
+        'author', 'category', 'location'
+    ).filter(pk__in=[post.pk for post in posts]).order_by('pk')
+    return CARDS_TEMPLATE.render(Context({'posts': list(posts)}))
+
+
+def test_cards_read_from_cache(feed_posts, django_assert_num_queries):
+    first = render_cards(feed_posts)
+    from blog.models import Post
+
+    posts = list(Post.objects.select_related(
+        'author', 'category', 'location'
+    ).order_by('pk'))
+    with django_assert_num_queries(0):
+        second = CARDS_TEMPLATE.render(Context({'posts': posts}))
+    assert first == second
+
+
+def test_card_version_follows_changes(mixer: Mixer, feed_posts):
+    render_cards(feed_posts)
+    post = feed_posts[0]
+    post.title = 'Новый заголовок карточки'
+    post.save()
+    assert 'Новый заголовок карточки' in render_cards(feed_posts)
+
+    mixer.blend('blog.Comment', post=post)
+    assert 'Комментарии (1)' in render_cards(feed_posts)
+
+    author = post.author
+    author.username = 'renamed_author'
+    author.save()
+    assert '@renamed_author' in render_cards(feed_posts)
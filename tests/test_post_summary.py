@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_summary_updated_on_save(mixer: Mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+        text=' '.join(f'слово{number}' for number in range(450)),
+    )
+    assert post.excerpt == ' '.join(
+        f'слово{number}' for number in range(10)
+    ) + ' …'
+    assert (post.word_count, post.reading_time) == (450, 3)
+
+    post.text = 'Короткий текст'
+    post.save()
+    post.refresh_from_db()
+    assert (post.excerpt, post.word_count, post.reading_time) == (
+        'Короткий текст', 2, 1
+    ), 'Убедитесь, что анонс пересчитывается при сохранении поста.'
+
+
+def test_feed_does_not_load_post_text(
+        mixer: Mixer, user, published_category, unlogged_client
+):
+    mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+        text='Начало текста ' + 'длинный хвост ' * 1000,
+    )
+    with CaptureQueriesContext(connection) as queries:
+        response = unlogged_client.get('/')
+    assert 'Начало текста' in response.content.decode('utf-8')
+    assert not any(
+        '"blog_post"."text"' in query['sql'] for query in queries
+    ), 'Убедитесь, что лента не загружает полный текст постов.'
+
+
+def test_summary_filled_by_loaddata(settings):
+    from blog.models import Post
+
+    call_command('loaddata', settings.BASE_DIR / '..' / 'db.json', verbosity=0)
+    assert not Post.objects.filter(excerpt='').exclude(text='').exists(), (
+        'Убедитесь, что анонс постов, загруженных loaddata, заполняется.'
+    )
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_published_manager_predicate(
+        mixer: Mixer, user, published_category, future_posts,
+        posts_with_unpublished_category
+):
+    from blog.models import Post
+
+    visible = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=False,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    assert list(Post.published.all()) == [visible], (
+        'Убедитесь, что менеджер `Post.published` возвращает только'
+        ' опубликованные посты опубликованных категорий с датой публикации'
+        ' в прошлом.'
+    )
+    assert list(Post.objects.published()) == [visible]
+
+
+def test_post_feed_indexes():
+    from blog.models import Post
+
+    index_names = {index.name for index in Post._meta.indexes}
+    assert {
+        'post_published_pub_date_idx',
+        'post_category_pub_date_idx',
+        'post_author_pub_date_idx',
+    } <= index_names
@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+from blog.publishing import PublicationSchedule, release_due_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_save_releases_only_past_posts(mixer: Mixer, published_category):
+    now = timezone.now()
+    past = mixer.blend(
+        'blog.Post', category=published_category,
+        pub_date=now - timedelta(minutes=1),
+    )
+    future = mixer.blend(
+        'blog.Post', category=published_category,
+        pub_date=now + timedelta(minutes=1),
+    )
+    assert past.is_released and not future.is_released
+
+    past.pub_date = now + timedelta(days=1)
+    past.save()
+    past.refresh_from_db()
+    assert not past.is_released, (
+        'Убедитесь, что перенос даты публикации в будущее снова скрывает'
+        ' пост до её наступления.'
+    )
+
+
+def test_schedule_fires_in_pub_date_order(mixer: Mixer, published_category):
+    now = timezone.now()
+    later, sooner, far = (
+        mixer.blend(
+            'blog.Post', category=published_category, is_published=True,
+            pub_date=now + timedelta(seconds=seconds),
+        )
+        for seconds in (20, 10, 7200)
+    )
+    schedule = PublicationSchedule(timedelta(hours=1))
+    schedule.load(now)
+    assert schedule.next_timer() == sooner.pub_date
+    assert len(schedule.heap) == 2, 'Таймеры за горизонтом не загружаются.'
+
+    assert schedule.pop_due(sooner.pub_date)
+    assert schedule.next_timer() == later.pub_date
+    assert release_due_posts(sooner.pub_date) == 1
+    assert set(Post.published.all()) == {sooner}
+
+
+def test_loaddata_releases_past_posts(settings):
+    call_command('loaddata', settings.BASE_DIR / '..' / 'db.json', verbosity=0)
+    assert Post.published.exists(), (
+        'Убедитесь, что посты из дампа без поля is_released выходят'
+        ' после loaddata.'
+    )
@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def query_budget_raise(settings):
+    settings.QUERY_BUDGET_ACTION = 'raise'
+
+
+@pytest.fixture
+def populated_post(mixer: Mixer, user, another_user, published_category):
+    posts = mixer.cycle(15).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        location__is_published=True,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    mixer.cycle(3).blend('blog.Comment', post=posts[0], author=user)
+    mixer.cycle(3).blend('blog.Comment', post=posts[0], author=another_user)
+    return posts[0]
+
+
+def test_read_views_within_budget(
+        query_budget_raise, user_client, unlogged_client, user,
+        populated_post
+):
+    post = populated_post
+    urls = (
+        '/',
+        f'/posts/{post.id}/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{user.username}/',
+    )
+    for client in (user_client, unlogged_client):
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == 200, (
+                f'Убедитесь, что страница {url} укладывается в бюджет'
+                ' SQL-запросов, заданный в `blog/urls.py`.'
+            )
+
+
+def test_write_views_within_budget(
+        query_budget_raise, caplog, user_client, populated_post
+):
+    post = populated_post
+    comment = post.comment_set.filter(author=post.author).first()
+    form_data = {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'category': post.category_id,
+        'is_published': True,
+        'pub_date': '2020-01-01',
+    }
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Комментарий'})
+    user_client.post(
+        f'/posts/{post.id}/edit_comment/{comment.id}/', {'text': 'Правка'}
+    )
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    user_client.post(f'/posts/{post.id}/edit/', form_data)
+    user_client.post('/posts/create/', form_data)
+    response = user_client.post(f'/posts/{post.id}/delete/')
+    assert response.status_code == 302
+    assert not [
+        record for record in caplog.records
+        if record.name == 'blog.query_budget'
+        and record.levelname == 'WARNING'
+    ], (
+        'Убедитесь, что изменяющие данные представления укладываются'
+        ' в бюджет SQL-запросов, заданный в `blog/urls.py`.'
+    )
+
+
+def test_post_delete_budget_independent_of_comments(
+        query_budget_raise, caplog, mixer: Mixer, user, user_client,
+        populated_post
+):
+    mixer.cycle(250).blend('blog.Comment', post=populated_post, author=user)
+    response = user_client.post(f'/posts/{populated_post.id}/delete/')
+    assert response.status_code == 302
+    assert 'blog.query_budget' not in [
+        record.name for record in caplog.records
+        if record.levelname == 'WARNING'
+    ], (
+        'Убедитесь, что число запросов при удалении поста не растёт'
+        ' с числом комментариев.'
+    )
+
+
+def test_budget_exceeded_after_commit_only_logged(
+        query_budget_raise, monkeypatch, caplog, user_client, populated_post
+):
+    from blog import urls
+    from blog.models import Post
+
+    monkeypatch.setitem(urls.query_budgets, 'delete_post', 1)
+    response = user_client.post(f'/posts/{populated_post.id}/delete/')
+    assert response.status_code == 302, (
+        'Убедитесь, что превышение бюджета после зафиксированного'
+        ' изменения данных не превращается в ошибку 500.'
+    )
+    assert not Post.objects.filter(pk=populated_post.pk).exists()
+    assert 'delete_post' in caplog.text
+
+
+def test_budget_exceeded_raises(
+        query_budget_raise, monkeypatch, unlogged_client, populated_post
+):
+    from blog import urls
+    from blog.middleware import QueryBudgetExceeded
+
+    monkeypatch.setitem(urls.query_budgets, 'index', 1)
+    with pytest.raises(QueryBudgetExceeded):
+        unlogged_client.get('/')
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.db import connection
+from django.utils import timezone
+
+from blog.models import Post
+from blog.routers import ReplicaRouter, replica_reads
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def replica_log(settings):
+    # Реплика указывает на ту же тестовую базу: проверяется только,
+    # включено ли чтение с реплик во время запросов представления.
+    settings.DATABASE_REPLICAS = ['default']
+    log = []
+
+    def record(execute, sql, params, many, context):
+        log.append(replica_reads.get() is not None)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(record):
+        yield log
+
+
+def test_router_reads_from_replicas_only_when_enabled(settings):
+    router = ReplicaRouter()
+    assert router.db_for_read(Post) == 'default'
+    token = replica_reads.set('replica_1')
+    try:
+        assert router.db_for_read(Post) == 'replica_1'
+        assert router.db_for_write(Post) == 'default'
+        assert router.db_for_read(Session) == 'default', (
+            'Убедитесь, что сессии всегда читаются с основной базы.'
+        )
+        assert router.db_for_read(get_user_model()) == 'default', (
+            'Убедитесь, что пользователи всегда читаются с основной базы.'
+        )
+    finally:
+        replica_reads.reset(token)
+    settings.DATABASE_REPLICAS = ['replica_1']
+    assert router.allow_migrate('replica_1', 'blog') is False
+
+
+def test_reads_stick_to_primary_after_write(
+        replica_log, user_client, mixer, user, published_category
+):
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    replica_log.clear()
+    user_client.get('/')
+    assert replica_log and all(replica_log), (
+        'Убедитесь, что лента читается с реплик.'
+    )
+
+    replica_log.clear()
+    response = user_client.post(
+        f'/posts/{post.id}/comment/', {'text': 'Комментарий'}
+    )
+    assert not any(replica_log), 'Запись должна идти в основную базу.'
+    assert 'primary_reads' in response.cookies
+
+    replica_log.clear()
+    user_client.get('/')
+    assert replica_log and not any(replica_log), (
+        'Убедитесь, что после записи пользователь читает основную базу.'
+    )
+
+
+def test_replica_pages_not_stored_under_tag_versions(
+        replica_log, unlogged_client, mixer, user, published_category
+):
+    mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    first = unlogged_client.get('/')
+    assert 'ETag' not in first and 'Last-Modified' not in first
+    replica_log.clear()
+    unlogged_client.get('/')
+    assert any(replica_log), (
+        'Убедитесь, что страница, построенная по реплике, не попадает'
+        ' в кэш под свежими версиями тегов.'
+    )
@@ -0,0 +1,84 @@
+from datetime import timedelta
+from urllib.parse import urlencode
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def searchable_posts(mixer, user, published_category):
+    def blend(title, text, **kwargs):
+        params = dict(
+            author=user,
+            category=published_category,
+            is_published=True,
+            pub_date=timezone.now() - timedelta(days=1),
+        )
+        params.update(kwargs)
+        return mixer.blend('blog.Post', title=title, text=text, **params)
+
+    return {
+        'in_title': blend('Путешествие на Байкал', 'Зимой было холодно.'),
+        'in_text': blend('Заметки', 'Про Байкал и нерпу.'),
+        'other': blend('Рецепт пирога', 'Мука, яйца, сахар.'),
+        'hidden': blend('Байкал', 'Черновик', is_published=False),
+        'future': blend(
+            'Байкал летом', 'Ещё не вышло',
+            pub_date=timezone.now() + timedelta(days=1),
+        ),
+    }
+
+
+def search_ids(client, query):
+    response = client.get('/search/', {'q': query})
+    assert response.status_code == 200
+    return [post.id for post in response.context['page_obj']]
+
+
+def test_search_ranks_title_matches_first(client, searchable_posts):
+    assert search_ids(client, 'байкал') == [
+        searchable_posts['in_title'].id,
+        searchable_posts['in_text'].id,
+    ], (
+        'Убедитесь, что поиск находит только опубликованные посты и ставит'
+        ' совпадения в заголовке выше совпадений в тексте.'
+    )
+    assert search_ids(client, 'пир') == [searchable_posts['other'].id]
+    assert search_ids(client, '"OR*') == []
+    assert search_ids(client, '') == []
+
+
+def test_search_index_follows_post_changes(client, searchable_posts):
+    post = searchable_posts['other']
+    post.title = 'Пирог с брусникой'
+    post.text = 'Брусника с Байкала.'
+    post.save()
+    assert search_ids(client, 'брусникой') == [post.id]
+    assert post.id in search_ids(client, 'байкала')
+
+    searchable_posts['in_title'].delete()
+    assert search_ids(client, 'холодно') == []
+
+    call_command('rebuild_search_index')
+    assert search_ids(client, 'брусника') == [post.id]
+
+
+def test_search_pagination_keeps_query(client, mixer, user, published_category):
+    mixer.cycle(12).blend(
+        'blog.Post',
+        title='Байкал',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    response = client.get('/search/', {'q': 'байкал'})
+    next_query = response.context['page_obj'].next_query
+    assert next_query == urlencode({'q': 'байкал', 'page': 2}), (
+        'Убедитесь, что ссылки на страницы поиска сохраняют запрос.'
+    )
+    second = client.get(f'/search/?{next_query}')
+    assert len(second.context['page_obj']) == 2
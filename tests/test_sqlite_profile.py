@@ -0,0 +1,31 @@
+import sqlite3
+
+import pytest
+from django.db import connection
+
+from blog.db import apply_sqlite_pragmas
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_pragmas_applied_to_new_connections(settings):
+    connection.close()
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous')
+        synchronous = cursor.fetchone()[0]
+        cursor.execute('PRAGMA temp_store')
+        temp_store = cursor.fetchone()[0]
+    assert (synchronous, temp_store) == (1, 2), (
+        'Убедитесь, что новое соединение SQLite получает PRAGMA из '
+        'настройки SQLITE_PRAGMAS.'
+    )
+
+
+def test_wal_journal_for_file_database(tmp_path, settings):
+    raw = sqlite3.connect(tmp_path / 'blog.sqlite3')
+    try:
+        apply_sqlite_pragmas(raw, settings.SQLITE_PRAGMAS)
+        journal_mode = raw.execute('PRAGMA journal_mode').fetchone()[0]
+    finally:
+        raw.close()
+    assert journal_mode == 'wal'
@@ -0,0 +1,63 @@
+import gzip
+
+import pytest
+from django.core.management import call_command
+from django.test import Client
+
+
+@pytest.fixture
+def collected_static(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STATICFILES_STORAGE = (
+        'blog.staticfiles.CompressedManifestStaticFilesStorage'
+    )
+    call_command('collectstatic', interactive=False, verbosity=0)
+    from django.contrib.staticfiles.storage import staticfiles_storage
+
+    return staticfiles_storage
+
+
+def test_collectstatic_writes_hashed_gzip_siblings(collected_static):
+    hashed_name = collected_static.stored_name('css/bootstrap.min.css')
+    assert hashed_name != 'css/bootstrap.min.css', (
+        'Убедитесь, что в имена собранных файлов добавляется хэш содержимого.'
+    )
+    path = collected_static.path(hashed_name)
+    with open(path, 'rb') as original, gzip.open(path + '.gz') as compressed:
+        assert compressed.read() == original.read()
+
+
+def test_middleware_serves_immutable_compressed_files(collected_static):
+    client = Client()
+    url = collected_static.url('css/bootstrap.min.css')
+    response = client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+    assert response.status_code == 200
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['Content-Type'].startswith('text/css')
+    assert 'immutable' in response['Cache-Control'], (
+        'Убедитесь, что файлы с хэшем в имени отдаются с заголовком'
+        ' Cache-Control: immutable.'
+    )
+    assert response['Vary'] == 'Accept-Encoding'
+    body = b''.join(response.streaming_content)
+    assert int(response['Content-Length']) == len(body)
+    assert b'bootstrap' in gzip.decompress(body)
+
+    plain = client.get(url, HTTP_ACCEPT_ENCODING='identity')
+    assert not plain.has_header('Content-Encoding')
+    assert b'bootstrap' in b''.join(plain.streaming_content)
+
+    not_modified = client.get(
+        url,
+        HTTP_ACCEPT_ENCODING='gzip',
+        HTTP_IF_NONE_MATCH=response['ETag'],
+    )
+    assert not_modified.status_code == 304
+
+    unhashed = client.get('/static/css/bootstrap.min.css')
+    assert 'immutable' not in unhashed['Cache-Control']
+
+
+def test_middleware_rejects_paths_outside_static_root(collected_static):
+    response = Client().get('/static/../settings.py')
+    assert response.status_code == 404